@@ -5,22 +5,51 @@ Input: 4_hero_matchups.csv with columns [Hero, Opponent Hero, Wins, Losses, Tota
 Output: Matchup heatmap and top polarized matchups.
 """
 
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
+
+# Fixed schema of 4_hero_matchups.csv (Win Rate is left to inference since it may carry '%')
+_MATCHUP_DTYPES = {
+    'Hero': 'category',
+    'Opponent Hero': 'category',
+    'Wins': 'int32',
+    'Losses': 'int32',
+    'Total Matches': 'int32'
+}
+
+# Heatmaps larger than this many cells only annotate their ANNOTATE_TOP_K most polarized cells
+ANNOTATE_ALL_MAX_CELLS = 400
+ANNOTATE_TOP_K = 20
 
 # --- 1. Load Matchup Data ---
 def load_matchup_data(filename):
-    """Load and clean matchup data."""
-    df = pd.read_csv(filename)
+    """Load and clean matchup data, reusing a Parquet copy when it is newer than the CSV."""
+    parquet = Path(filename).with_suffix('.parquet')
+    if parquet.exists() and parquet.stat().st_mtime >= Path(filename).stat().st_mtime:
+        return pd.read_parquet(parquet)
+    
+    df = pd.read_csv(filename, engine='pyarrow', dtype=_MATCHUP_DTYPES)
     
     # Clean column names (remove spaces)
     df.columns = df.columns.str.replace(' ', '_')
     
+    # Share one sorted hero vocabulary between both sides so pivots key on matching codes
+    heroes = pd.CategoricalDtype(sorted(
+        set(df['Hero'].dropna()) | set(df['Opponent_Hero'].dropna())
+    ))
+    df['Hero'] = df['Hero'].astype(heroes)
+    df['Opponent_Hero'] = df['Opponent_Hero'].astype(heroes)
+    
     # Ensure Win Rate is numeric (if it has '%' signs)
-    if isinstance(df['Win_Rate_(%)'].iloc[0], str):
-        df['Win_Rate_(%)'] = df['Win_Rate_(%)'].str.replace('%', '').astype(float)
+    win_rate = df['Win_Rate_(%)']
+    if pd.api.types.is_string_dtype(win_rate):
+        df['Win_Rate_(%)'] = pd.to_numeric(win_rate.str.rstrip('%'), downcast='float')
     
+    # Cache the cleaned, typed frame for the next run
+    df.to_parquet(parquet, compression='zstd')
     return df
 
 # --- 2. Generate Matchup Heatmap ---
@@ -58,26 +87,35 @@ def load_matchup_data(filename):
 def plot_matchup_heatmap(df):
     """Create a cleaner, more readable win rate heatmap."""
     # Pivot and filter matchups with sufficient data (e.g., >= 10 matches)
-    matchup_df = df[df['Total_Matches'] >= 10].pivot_table(
-        values='Win_Rate_(%)', 
+    # Rows are already one per (Hero, Opponent) pair, so a plain pivot is enough
+    matchup_df = df[df['Total_Matches'] >= 10].pivot(
         index='Hero', 
         columns='Opponent_Hero',
-        aggfunc='mean'
+        values='Win_Rate_(%)'
     )
     
     # Set up the figure
-    plt.figure(figsize=(18, 16))  # Larger size for clarity
-    ax = sns.heatmap(
-        matchup_df,
-        annot=True,
-        annot_kws={'fontsize': 9},  # Smaller annotation font
-        cmap='coolwarm',
-        center=50,
-        fmt='.0f',  # Round to whole numbers
-        linewidths=0.3,
-        linecolor='grey',
-        cbar_kws={'label': 'Win Rate (%)'}
-    )
+    fig, ax = plt.subplots(figsize=(18, 16))  # Larger size for clarity
+    
+    # imshow draws the whole matrix as one raster instead of one quad per cell
+    arr = matchup_df.to_numpy(dtype=np.float32)
+    im = ax.imshow(arr, cmap='coolwarm', vmin=0, vmax=100, aspect='auto', interpolation='nearest')
+    fig.colorbar(im, ax=ax, label='Win Rate (%)')
+    
+    # Thin grey cell borders
+    ax.set_xticks(np.arange(arr.shape[1] + 1) - 0.5, minor=True)
+    ax.set_yticks(np.arange(arr.shape[0] + 1) - 0.5, minor=True)
+    ax.grid(which='minor', color='grey', linewidth=0.3)
+    ax.tick_params(which='minor', length=0)
+    
+    # Annotate cells that have data, rounded to whole numbers; on large matrices
+    # only the most lopsided matchups get a label to keep the text artist count bounded
+    cells = np.argwhere(~np.isnan(arr))
+    if arr.size > ANNOTATE_ALL_MAX_CELLS and len(cells) > ANNOTATE_TOP_K:
+        deviation = np.abs(arr[cells[:, 0], cells[:, 1]] - 50)
+        cells = cells[np.argpartition(-deviation, ANNOTATE_TOP_K)[:ANNOTATE_TOP_K]]
+    for i, j in cells:
+        ax.text(j, i, f"{arr[i, j]:.0f}", ha='center', va='center', fontsize=9)
     
     # Improve labels and title
     plt.title(
@@ -87,8 +125,10 @@ def plot_matchup_heatmap(df):
     )
     plt.xlabel('Opponent Hero', fontsize=12)
     plt.ylabel('Hero', fontsize=12)
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
-    ax.set_yticklabels(ax.get_yticklabels(), rotation=0)
+    ax.set_xticks(np.arange(arr.shape[1]))
+    ax.set_xticklabels(matchup_df.columns, rotation=45, ha='right')
+    ax.set_yticks(np.arange(arr.shape[0]))
+    ax.set_yticklabels(matchup_df.index, rotation=0)
     
     # Save high-resolution image
     plt.tight_layout()
@@ -99,21 +139,30 @@ def plot_matchup_heatmap(df):
 
     
 # --- 3. Identify Polarized Matchups ---
+def _deviation_from_even(win_rate):
+    """Return |win rate - 50| as float32, computed in a single buffer without temporaries."""
+    deviation = np.array(win_rate, dtype=np.float32)  # always a copy, safe to modify in place
+    np.subtract(deviation, 50.0, out=deviation)
+    return np.abs(deviation, out=deviation)
+
+def _polarized_indices(deviation, threshold):
+    """Return row positions whose win rate is >= threshold or <= 100 - threshold."""
+    # Both tails are the same as |win rate - 50| >= threshold - 50
+    return np.flatnonzero(deviation >= (threshold - 50))
+
 def find_polarized_matchups(df, threshold=60):
     """
     Find matchups where win rate >= threshold (strong favor).
     Returns a DataFrame sorted by most polarized.
     """
-    polarized = df[
-        (df['Win_Rate_(%)'] >= threshold) | 
-        (df['Win_Rate_(%)'] <= 100 - threshold)
-    ].sort_values('Win_Rate_(%)', ascending=False)
+    deviation = _deviation_from_even(df['Win_Rate_(%)'].to_numpy())
+    idx = _polarized_indices(deviation, threshold)
     
-    # Calculate absolute deviation from 50%
-    polarized['Deviation'] = abs(polarized['Win_Rate_(%)'] - 50)
-    polarized = polarized.sort_values('Deviation', ascending=False)
+    # Absolute deviation from 50%, only for the selected rows
+    polarized = df.take(idx).assign(Deviation=deviation[idx])
+    order = np.argsort(-polarized['Deviation'].to_numpy(), kind='stable')
     
-    return polarized
+    return polarized.iloc[order]
 
 # --- 4. Main Execution ---
 def main():
@@ -5,19 +5,37 @@ Input: CSV with columns [Hero, Wins, Losses, Total Matches, Win Rate (%)]
 Output: Visualizations and exported CSV with insights.
 """
 
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Fixed schema of 3_hero_stats.csv (Win Rate is left to inference since it may carry '%')
+_HERO_STATS_DTYPES = {
+    'Hero': 'category',
+    'Wins': 'int32',
+    'Losses': 'int32',
+    'Total Matches': 'int32'
+}
+
 # --- 1. Load and Prepare Data ---
 def load_data(filename):
-    """Load and clean the dataset."""
-    df = pd.read_csv(filename)
+    """Load and clean the dataset, reusing a Parquet copy when it is newer than the CSV."""
+    parquet = Path(filename).with_suffix('.parquet')
+    if parquet.exists() and parquet.stat().st_mtime >= Path(filename).stat().st_mtime:
+        return pd.read_parquet(parquet)
+    
+    df = pd.read_csv(filename, engine='pyarrow', dtype=_HERO_STATS_DTYPES)
     
     # Ensure Win Rate is numeric (if it has '%' signs)
-    if isinstance(df['Win Rate (%)'].iloc[0], str):
-        df['Win Rate (%)'] = df['Win Rate (%)'].str.replace('%', '').astype(float)
+    win_rate = df['Win Rate (%)']
+    if pd.api.types.is_string_dtype(win_rate):
+        df['Win Rate (%)'] = pd.to_numeric(win_rate.str.rstrip('%'), downcast='float')
     
+    # Cache the cleaned, typed frame for the next run
+    df.to_parquet(parquet, compression='zstd')
     return df
 
 # --- 2. Analysis Functions ---
@@ -64,9 +82,17 @@ def analyze_matchups(df):
     """Optional: Generate matchup heatmap if data is structured for it."""
     try:
         # Pivot table (adjust columns if needed)
-        matchup_df = df.pivot_table(values='Win Rate (%)', index='Hero', columns='Opponent')
-        plt.figure(figsize=(12, 10))
-        sns.heatmap(matchup_df, annot=True, cmap='coolwarm', center=50, fmt='.1f')
+        matchup_df = df.pivot_table(values='Win Rate (%)', index='Hero', columns='Opponent', observed=True, sort=False)
+        arr = matchup_df.to_numpy(dtype=np.float32)
+        fig, ax = plt.subplots(figsize=(12, 10))
+        im = ax.imshow(arr, cmap='coolwarm', vmin=0, vmax=100, aspect='auto', interpolation='nearest')
+        fig.colorbar(im, ax=ax)
+        for i, j in np.argwhere(~np.isnan(arr)):
+            ax.text(j, i, f"{arr[i, j]:.1f}", ha='center', va='center')
+        ax.set_xticks(np.arange(arr.shape[1]))
+        ax.set_xticklabels(matchup_df.columns, rotation=90)
+        ax.set_yticks(np.arange(arr.shape[0]))
+        ax.set_yticklabels(matchup_df.index)
         plt.title('Hero Matchup Win Rates (%)')
         plt.savefig('matchup_heatmap.png', bbox_inches='tight')
         plt.close()
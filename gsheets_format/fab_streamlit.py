@@ -1,15 +1,19 @@
 import streamlit as st
-from main import scrape_round, process_data
+from main import SESSION, scrape_round, process_data
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
+import os
+import hashlib
+import time
+from pathlib import Path
 from datetime import datetime
 import sys 
-from bs4 import BeautifulSoup
-import requests
+from bs4 import BeautifulSoup, SoupStrainer
 import streamlit.components.v1 as components
 
 # ============== CONFIGURATION ==============
@@ -20,17 +24,250 @@ st.set_page_config(
 )
 
 # ============== CACHING ==============
+SCRAPE_CACHE_DIR = Path('.fab_scrape_cache')
+SCRAPE_CACHE_TTL = 86400  # seconds a scraped round stays valid on disk
+# A tournament whose rounds all look complete may only be between rounds, so the whole
+# tournament is kept for a short time and the next round is picked up on re-scrape
+TOURNAMENT_CACHE_TTL = 3600
+
+def _scrape_cache_path(url, round_num):
+    key = hashlib.blake2b(f"{url}|{round_num}".encode('utf-8'), digest_size=16).hexdigest()
+    return SCRAPE_CACHE_DIR / f"{key}.json"
+
+def persistent_scrape(url, round_num):
+    """scrape_round backed by a JSON file per round, so results survive app restarts."""
+    path = _scrape_cache_path(url, round_num)
+    try:
+        if time.time() - path.stat().st_mtime < SCRAPE_CACHE_TTL:
+            return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        pass  # missing, stale or unreadable entry; fall back to the network
+    
+    matches = scrape_round(url, round_num)
+    
+    # Only rounds with a result for every match are stored; rounds still to be played
+    # or still in progress are left to the hour-long cache in cached_scrape
+    if matches and all(match['Winner'] is not None for match in matches):
+        SCRAPE_CACHE_DIR.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(matches), encoding='utf-8')
+        tmp_path.replace(path)
+    return matches
+
+def _tournament_cache_path(url):
+    key = hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+    return SCRAPE_CACHE_DIR / f"{key}.parquet"
+
+def load_tournament_matches(url):
+    """Matches of a whole tournament stored on disk, or None if missing or stale."""
+    path = _tournament_cache_path(url)
+    try:
+        if time.time() - path.stat().st_mtime < TOURNAMENT_CACHE_TTL:
+            return pd.read_parquet(path)
+    except (OSError, ValueError):
+        pass
+    return None
+
+def store_tournament_matches(url, matches):
+    SCRAPE_CACHE_DIR.mkdir(exist_ok=True)
+    path = _tournament_cache_path(url)
+    tmp_path = path.with_suffix('.tmp')
+    matches.to_parquet(tmp_path, compression='zstd')
+    tmp_path.replace(path)
+
+# Errors propagate instead of being returned, so a failed fetch is never cached and
+# the caller can tell it apart from a round page that isn't there
 @st.cache_data(ttl=3600, show_spinner=False)
 def cached_scrape(url, round_num):
-    try:
-        return scrape_round(url, round_num)
-    except Exception as e:
-        st.warning(f"Error in Round {round_num}: {str(e)}")
-        return None
+    return persistent_scrape(url, round_num)
+
+HERO_COLUMNS = ('Hero', 'Opponent Hero', 'Player 1 Hero', 'Player 2 Hero', 'Winning Hero')
+# Player names repeat once per round here; in 2_player_stats they are unique, so left as strings
+PLAYER_COLUMNS = {'5_player_details': ('Player', 'Opponent')}
+
+def _categorize_heroes(data):
+    """Cast hero name columns in every frame to one shared categorical dtype."""
+    heroes = set()
+    for frame in data.values():
+        for col in HERO_COLUMNS:
+            if col in frame.columns:
+                heroes.update(frame[col].dropna())
+    
+    hero_dtype = pd.CategoricalDtype(sorted(heroes))
+    for frame in data.values():
+        for col in HERO_COLUMNS:
+            if col in frame.columns:
+                frame[col] = frame[col].astype(hero_dtype)
+    return data
+
+def _categorize_players(data):
+    """Cast repeated player name columns to a categorical dtype shared within each frame."""
+    for key, columns in PLAYER_COLUMNS.items():
+        frame = data[key]
+        players = pd.unique(pd.concat([frame[col] for col in columns]).dropna())
+        player_dtype = pd.CategoricalDtype(sorted(players))
+        for col in columns:
+            frame[col] = frame[col].astype(player_dtype)
+    return data
+
+# Tables displayed best-first; sorted once here so renders only need to slice
+RANKED_KEYS = ('2_player_stats', '3_hero_stats')
+
+def _rank_by_win_rate(data):
+    """Sort the player and hero tables by win rate once, best first."""
+    for key in RANKED_KEYS:
+        data[key] = data[key].sort_values('Win Rate (%)', ascending=False, ignore_index=True)
+    return data
+
+# Derived frames added by cached_process on top of the process_data output
+PIVOT_KEYS = ('4_hero_matchups_pivot', '4_hero_matchups_counts')
+
+def _finalize(processed):
+    """Apply dtypes and ranking, and attach the derived frames the views rely on."""
+    processed = _rank_by_win_rate(_categorize_players(_categorize_heroes(processed)))
+    
+    # Pivot once per dataset so heatmap renders only need to mask cells
+    processed['4_hero_matchups_pivot'], processed['4_hero_matchups_counts'] = _pivot_matchups(
+        processed['4_hero_matchups']
+    )
+    return processed
+
+def _process_matches(matches):
+    return _finalize(process_data(matches))
 
 @st.cache_data(ttl=3600)
 def cached_process(data):
-    return process_data(data)
+    return _process_matches(data)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _pivot_matchups(matchups_df):
+    """Pivot win rates and match counts once so the slider only has to mask cells."""
+    # process_data emits one row per (Hero, Opponent Hero), so each row scatters into one cell
+    hero_codes, heroes = pd.factorize(matchups_df['Hero'], sort=True)
+    opp_codes, opponents = pd.factorize(matchups_df['Opponent Hero'], sort=True)
+    valid = (hero_codes >= 0) & (opp_codes >= 0)
+    hero_codes, opp_codes = hero_codes[valid], opp_codes[valid]
+    
+    win_rates = np.full((len(heroes), len(opponents)), np.nan, dtype=np.float32)
+    win_rates[hero_codes, opp_codes] = matchups_df['Win Rate (%)'].to_numpy(dtype=np.float32)[valid]
+    counts = np.zeros(win_rates.shape, dtype=np.int32)
+    counts[hero_codes, opp_codes] = matchups_df['Total Matches'].to_numpy(dtype=np.int32)[valid]
+    
+    index = pd.Index(heroes, name='Hero')
+    columns = pd.Index(opponents, name='Opponent Hero')
+    return pd.DataFrame(win_rates, index=index, columns=columns), pd.DataFrame(counts, index=index, columns=columns)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _serialize_json(_df_dict, tournament_name, digest):
+    """Serialize the analysis frames for download, once per tournament."""
+    # Keyed on the name and the content digest taken at load time so the frames aren't
+    # re-hashed on every rerun;
+    # pandas' C serializer writes each frame directly and only the outer object is glued here
+    parts = ','.join(
+        f'{json.dumps(k)}:{v.to_json(orient="records")}'
+        for k, v in _df_dict.items()
+        if k not in PIVOT_KEYS
+    )
+    return ('{' + parts + '}').encode('utf-8')
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _combined_frames(_multi_df, names, digests):
+    """Concatenate per-tournament frames once per set of loaded tournaments."""
+    # Keyed on the names and the content digests taken when the tournaments were loaded;
+    # the frames themselves are not hashed
+    # One shared dtype keeps Tournament integer-coded across all three frames
+    tournament_dtype = pd.CategoricalDtype(list(dict.fromkeys(names)))
+    
+    def concat_tagged(key):
+        # keys= tags each tournament's rows in the index, avoiding a per-frame assign copy;
+        # the index level codes become the Tournament codes without materializing any strings
+        frame = pd.concat([df[key] for df in _multi_df], keys=names)
+        level_codes = tournament_dtype.categories.get_indexer(frame.index.levels[0])
+        tournament = pd.Categorical.from_codes(level_codes[frame.index.codes[0]], dtype=tournament_dtype)
+        frame = frame.reset_index(drop=True)
+        frame.insert(0, 'Tournament', tournament)
+        return frame
+    
+    all_matches = concat_tagged('1_match_results')
+    all_hero_stats = concat_tagged('3_hero_stats')
+    all_player_stats = concat_tagged('2_player_stats')
+    
+    # Hero categories differ per tournament, so concat falls back to strings; re-encode once
+    all_hero_stats['Hero'] = all_hero_stats['Hero'].astype('category')
+    
+    return all_matches, all_hero_stats, all_player_stats
+
+def multi_cache_key():
+    """(names, digests) of the loaded tournaments, the cache key for frames built from them."""
+    return tuple(st.session_state.tournament_names), tuple(st.session_state.multi_digests)
+
+def combined_frames():
+    """Return (all_matches, all_hero_stats, all_player_stats) for the loaded tournaments."""
+    return _combined_frames(st.session_state.multi_df, *multi_cache_key())
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _summary_counts(_all_matches, _all_hero_stats, _all_player_stats, digests):
+    """Totals shown above the aggregated tabs; they only change with the set of tournaments."""
+    # Hero is re-encoded as categorical after concat, so its categories are the distinct heroes
+    return (
+        len(_all_matches),
+        _all_player_stats['Player'].nunique(),
+        len(_all_hero_stats['Hero'].cat.categories)
+    )
+
+def _win_rate(stats):
+    """Win rate in percent rounded like process_data, 0 when no games were decided."""
+    return (stats['Wins'] / (stats['Wins'] + stats['Losses']) * 100).round(2).fillna(0)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _aggregate_tournaments(_multi_df, names, digests):
+    """Merge per-tournament results by summing their counts, without reprocessing any match."""
+    all_matches, all_hero_stats, all_player_stats = _combined_frames(_multi_df, names, digests)
+    counts = ['Wins', 'Losses', 'Total Matches']
+    
+    hero_stats = all_hero_stats.groupby('Hero', as_index=False, observed=True, sort=False)[counts].sum()
+    hero_stats['Win Rate (%)'] = _win_rate(hero_stats)
+    
+    hero_matchups = (
+        pd.concat([df['4_hero_matchups'] for df in _multi_df], ignore_index=True)
+        .groupby(['Hero', 'Opponent Hero'], as_index=False, observed=True, sort=False)[counts].sum()
+    )
+    hero_matchups['Win Rate (%)'] = _win_rate(hero_matchups)
+    
+    # Heroes Used is rebuilt from the details, since hero names themselves contain ', '
+    player_details = pd.concat([df['5_player_details'] for df in _multi_df], ignore_index=True)
+    heroes_used = (
+        player_details.drop_duplicates(['Player', 'Hero'])
+        .dropna(subset=['Hero'])
+        .groupby('Player', sort=False, dropna=False)['Hero']
+        .agg(', '.join)
+    )
+    # A missing player name stays its own row, as it does in process_data
+    player_stats = all_player_stats.groupby('Player', as_index=False, sort=False, dropna=False)[['Wins', 'Losses']].sum()
+    player_stats['Win Rate (%)'] = _win_rate(player_stats)
+    player_stats['Heroes Used'] = heroes_used.reindex(player_stats['Player']).to_numpy()
+    
+    return _finalize({
+        '1_match_results': all_matches,
+        '2_player_stats': player_stats,
+        '3_hero_stats': hero_stats,
+        '4_hero_matchups': hero_matchups,
+        '5_player_details': player_details
+    })
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _hero_tournament_metric(_combined, names, digests, metric):
+    """Mean of a metric per (Hero, Tournament), long and as a Hero x Tournament matrix."""
+    hero_metric = _combined.groupby(['Hero', 'Tournament'], observed=True, sort=False)[metric].mean().reset_index()
+    
+    # Reshape the already aggregated frame instead of running a second pivot_table
+    # over the combined stats; reindex keeps first-appearance order like sort=False
+    hero_matrix = (
+        hero_metric.pivot(index='Hero', columns='Tournament', values=metric)
+        .reindex(index=pd.unique(hero_metric['Hero']), columns=pd.unique(hero_metric['Tournament']))
+        .fillna(0)
+    )
+    return hero_metric, hero_matrix
 
 # ============== SESSION STATE ==============
 if 'df' not in st.session_state:
@@ -39,11 +276,26 @@ if 'multi_df' not in st.session_state:
     st.session_state.multi_df = []
 if 'tournament_names' not in st.session_state:
     st.session_state.tournament_names = []
+if 'df_digest' not in st.session_state:
+    st.session_state.df_digest = None
+if 'multi_digests' not in st.session_state:
+    st.session_state.multi_digests = []
 
 # ============== VISUALIZATIONS ==============
-def plot_hero_performance(df):
-    hero_stats = df['3_hero_stats'].sort_values('Win Rate (%)', ascending=False)
-    
+def _frame_digest(df):
+    """Content hash of a DataFrame, used to key cached figures."""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).digest()
+
+# Figures are built once per distinct input and shared across reruns; they are never mutated
+def dataset_digest(data):
+    """Content digest of an analyzed tournament; all its other frames derive from the match results."""
+    return _frame_digest(data['1_match_results'])
+
+cache_figure = st.cache_resource(hash_funcs={pd.DataFrame: _frame_digest}, max_entries=64, show_spinner=False)
+
+@cache_figure
+def _hero_performance_fig(hero_stats):
     fig = make_subplots(rows=1, cols=2, subplot_titles=("Win Rate", "Play Rate"))
     
     fig.add_trace(
@@ -71,36 +323,64 @@ def plot_hero_performance(df):
         showlegend=False,
         margin=dict(l=50, r=50, b=100, t=50, pad=4)
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+HEATMAP_MAX_HEROES = 50
 
+# Charts with their own widgets are fragments, so moving a slider reruns only that chart
+@st.fragment
+def plot_hero_performance(df, key_suffix=""):
+    top_n = st.slider("Show top N heroes", 5, 30, 15, key=f"hero_top_n_{key_suffix}")
+    
+    # Keep the most played heroes; the index still follows the _rank_by_win_rate order
+    hero_stats = df['3_hero_stats']
+    shown = hero_stats['Total Matches'].nlargest(top_n).index.sort_values()
+    st.plotly_chart(_hero_performance_fig(hero_stats.loc[shown]), use_container_width=True)
+
+@st.fragment
 def plot_matchup_heatmap(df, key_suffix=""):
-    min_matches = st.slider(
-        "Minimum matches to display", 
-        min_value=1, 
-        max_value=20, 
-        value=5,
-        key=f"heatmap_slider_{key_suffix}"
-    )
-    
-    filtered = df['4_hero_matchups'][
-        df['4_hero_matchups']['Total Matches'] >= min_matches
-    ]
-    
-    heatmap_data = filtered.pivot_table(
-        values='Win Rate (%)',
-        index='Hero',
-        columns='Opponent Hero',
-        aggfunc='mean'
-    )
+    # Inside a form the slider only redraws the heatmap once Apply is pressed
+    with st.form(key=f"heatmap_form_{key_suffix}"):
+        min_matches = st.slider(
+            "Minimum matches to display", 
+            min_value=1, 
+            max_value=20, 
+            value=5,
+            key=f"heatmap_slider_{key_suffix}"
+        )
+        st.form_submit_button("Apply")
     
+    if '4_hero_matchups_pivot' in df:
+        win_rate_pivot, total_matches_pivot = df['4_hero_matchups_pivot'], df['4_hero_matchups_counts']
+    else:
+        win_rate_pivot, total_matches_pivot = _pivot_matchups(df['4_hero_matchups'])
+    
+    # The cached matrices don't depend on the slider; each tick only recomputes a numpy mask
+    win_rates = win_rate_pivot.to_numpy()
+    counts = total_matches_pivot.to_numpy()
+    heroes, opponents = win_rate_pivot.index, win_rate_pivot.columns
+    
+    # Hide cells below the threshold and drop heroes left with no visible matchups
+    visible = counts >= min_matches
+    rows, cols = visible.any(axis=1), visible.any(axis=0)
+    
+    # On very large metas, keep only the most played heroes to bound the browser payload
+    if max(rows.sum(), cols.sum()) > HEATMAP_MAX_HEROES:
+        played = np.where(rows, counts.sum(axis=1), -1)
+        most_played = np.zeros_like(rows)
+        most_played[np.argsort(-played, kind='stable')[:HEATMAP_MAX_HEROES]] = True
+        visible &= (most_played & rows)[:, None] & opponents.isin(heroes[most_played])[None, :]
+        rows, cols = visible.any(axis=1), visible.any(axis=0)
+    
+    # float32 halves the serialized z array; NaN cells are simply not drawn
+    z = np.where(visible, win_rates, np.nan)[np.ix_(rows, cols)].astype(np.float32, copy=False)
     fig = go.Figure(data=go.Heatmap(
-        z=heatmap_data.values,
-        x=heatmap_data.columns,
-        y=heatmap_data.index,
+        z=z,
+        x=opponents[cols],
+        y=heroes[rows],
         colorscale='RdBu',
         zmid=50,
-        text=heatmap_data.values.round(1),
+        zsmooth=False,  # each cell is its own matchup; no blending into neighbours
         hoverinfo="x+y+z"
     ))
     
@@ -114,9 +394,8 @@ def plot_matchup_heatmap(df, key_suffix=""):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def plot_player_performance(df):
-    player_stats = df['2_player_stats'].sort_values('Win Rate (%)', ascending=False).head(20)
-    
+@cache_figure
+def _player_performance_fig(player_stats):
     fig = px.bar(
         player_stats,
         x='Player',
@@ -133,59 +412,74 @@ def plot_player_performance(df):
         yaxis_title="Win Rate (%)",
         margin=dict(l=50, r=50, b=150, t=50)
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
+def plot_player_performance(df, top_n=20):
+    # Player stats are ranked once at processing time, so the top N is a plain slice
+    st.plotly_chart(_player_performance_fig(df['2_player_stats'].head(top_n)), use_container_width=True)
+
+@cache_figure
+def _comparison_bar_fig(plot_df, metric, top_heroes):
+    return px.bar(
+        plot_df,
+        x='Hero',
+        y=metric,
+        color='Tournament',
+        barmode='group',
+        category_orders={'Hero': list(top_heroes)},
+        title=f"Top {len(top_heroes)} Heroes by {metric} Across Tournaments"
+    )
+
+@cache_figure
+def _comparison_heatmap_fig(heatmap_data, metric):
+    return px.imshow(
+        heatmap_data,
+        labels=dict(x="Tournament", y="Hero", color=metric),
+        aspect="auto",
+        color_continuous_scale='Viridis'
+    )
+
+@st.fragment
 def plot_multi_tournament_comparison():
     st.header("🏆 Multi-Tournament Comparison")
     
     if len(st.session_state.multi_df) < 2:
         st.warning("Add at least 2 tournaments to enable comparison")
-        return
+        return None
     
     # Combine hero stats from all tournaments
-    combined = pd.concat([
-        df['3_hero_stats'].assign(Tournament=name)
-        for df, name in zip(st.session_state.multi_df, st.session_state.tournament_names)
-    ])
+    _, combined, _ = combined_frames()
+    
+    with st.form(key="multi_comparison_form"):
+        # Comparison metrics
+        metric = st.selectbox(
+            "Comparison Metric",
+            ['Win Rate (%)', 'Total Matches', 'Wins'],
+            key="multi_metric"
+        )
+        
+        # Top heroes comparison
+        top_n = st.slider("Number of top heroes to show", 5, 20, 10, key="top_n")
+        st.form_submit_button("Apply")
     
-    # Comparison metrics
-    metric = st.selectbox(
-        "Comparison Metric",
-        ['Win Rate (%)', 'Total Matches', 'Wins'],
-        key="multi_metric"
-    )
+    hero_metric, heatmap_data = _hero_tournament_metric(combined, *multi_cache_key(), metric)
     
-    # Top heroes comparison
-    top_n = st.slider("Number of top heroes to show", 5, 20, 10, key="top_n")
+    # Rank heroes on the small grouped frame and plot only the top N
+    top_heroes = hero_metric.groupby('Hero', observed=True)[metric].mean().nlargest(top_n).index
     
-    fig = px.bar(
-        combined.groupby(['Hero', 'Tournament'])[metric].mean().reset_index(),
-        x='Hero',
-        y=metric,
-        color='Tournament',
-        barmode='group',
-        title=f"Top {top_n} Heroes by {metric} Across Tournaments"
+    fig = _comparison_bar_fig(
+        hero_metric[hero_metric['Hero'].isin(top_heroes)],
+        metric,
+        tuple(top_heroes)
     )
-    
     st.plotly_chart(fig, use_container_width=True)
     
     # Heatmap of hero appearances
-    heatmap_data = combined.pivot_table(
-        index='Hero',
-        columns='Tournament',
-        values=metric,
-        aggfunc='mean'
-    ).fillna(0)
-    
-    fig = px.imshow(
-        heatmap_data,
-        labels=dict(x="Tournament", y="Hero", color=metric),
-        aspect="auto",
-        color_continuous_scale='Viridis'
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(_comparison_heatmap_fig(heatmap_data, metric), use_container_width=True)
+    
+    return combined
 
+@st.fragment
 def plot_aggregated_analysis():
     st.header("📊 Aggregated Tournament Data")
     
@@ -193,32 +487,17 @@ def plot_aggregated_analysis():
         st.warning("Add at least 1 tournament to enable aggregation")
         return
     
-    # Combine all match results
-    all_matches = pd.concat([
-        df['1_match_results'].assign(Tournament=name)
-        for df, name in zip(st.session_state.multi_df, st.session_state.tournament_names)
-    ])
-    
-    # Combine all hero stats
-    all_hero_stats = pd.concat([
-        df['3_hero_stats'].assign(Tournament=name)
-        for df, name in zip(st.session_state.multi_df, st.session_state.tournament_names)
-    ])
-    
-    # Combine all player stats
-    all_player_stats = pd.concat([
-        df['2_player_stats'].assign(Tournament=name)
-        for df, name in zip(st.session_state.multi_df, st.session_state.tournament_names)
-    ])
+    # Combine match results, hero stats and player stats from all tournaments
+    all_matches, all_hero_stats, all_player_stats = combined_frames()
     
     # Process the aggregated data
     with st.spinner("Processing aggregated data..."):
-        aggregated_data = process_data(all_matches.to_dict('records'))
+        aggregated_data = _aggregate_tournaments(st.session_state.multi_df, *multi_cache_key())
     
     # Show summary metrics
-    total_matches = len(all_matches)
-    unique_players = all_player_stats['Player'].nunique()
-    unique_heroes = all_hero_stats['Hero'].nunique()
+    total_matches, unique_players, unique_heroes = _summary_counts(
+        all_matches, all_hero_stats, all_player_stats, tuple(st.session_state.multi_digests)
+    )
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -232,70 +511,151 @@ def plot_aggregated_analysis():
     tab1, tab2, tab3 = st.tabs(["Hero Performance", "Matchups", "Player Stats"])
     
     with tab1:
-        plot_hero_performance(aggregated_data)
-        with st.expander("View All Hero Stats"):
-            st.dataframe(
-                aggregated_data['3_hero_stats'].sort_values('Win Rate (%)', ascending=False),
-                use_container_width=True,
-                height=400
-            )
+        plot_hero_performance(aggregated_data, "aggregated")
+        lazy_dataframe("View All Hero Stats", aggregated_data['3_hero_stats'], "aggregated_hero_stats")
     
     with tab2:
         plot_matchup_heatmap(aggregated_data, "aggregated")
-        with st.expander("View All Matchups"):
-            st.dataframe(
-                aggregated_data['4_hero_matchups'],
-                use_container_width=True,
-                height=400
-            )
+        lazy_dataframe("View All Matchups", aggregated_data['4_hero_matchups'], "aggregated_matchups")
     
     with tab3:
         plot_player_performance(aggregated_data)
-        with st.expander("View All Player Stats"):
-            st.dataframe(
-                aggregated_data['2_player_stats'].sort_values('Win Rate (%)', ascending=False),
-                use_container_width=True,
-                height=400
-            )
+        lazy_dataframe("View All Player Stats", aggregated_data['2_player_stats'], "aggregated_player_stats")
+
+def lazy_dataframe(label, frame, key):
+    """Show a table in an expander, only sending it to the browser while the expander is open."""
+    # Stateful expanders rerun on toggle, so closed ones skip serializing the frame entirely
+    expander = st.expander(label, key=key, on_change="rerun")
+    if expander.open:
+        expander.dataframe(frame, use_container_width=True, height=400)
 
 # ============== CORE FUNCTIONS ==============
+# Round fetches are network-bound; override with FAB_SCRAPE_WORKERS to go easier on the site
+SCRAPE_WORKERS = int(os.environ.get('FAB_SCRAPE_WORKERS', 20))
+
+@st.cache_resource
+def scrape_pool():
+    """Round-fetch pool shared across reruns and sessions."""
+    # Reruns re-execute this module, so a module-level pool would be rebuilt on every click;
+    # concurrent tournaments share it too, which caps total requests at SCRAPE_WORKERS
+    return ThreadPoolExecutor(max_workers=SCRAPE_WORKERS, thread_name_prefix='scrape')
+
+MAX_ROUNDS = 20
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _analyze_tournament_cached(url):
+    """Scrape and process every round of a tournament; memoized on the URL."""
+    # A whole tournament on disk skips the round fan-out, including rounds that don't exist
+    all_rounds = load_tournament_matches(url)
+    if all_rounds is None:
+        all_rounds, finished = _scrape_tournament(url)
+        # Only a finished-looking tournament is kept on disk, and only for TOURNAMENT_CACHE_TTL;
+        # anything still in progress or partly failed is left to this hour-long cache
+        if finished:
+            store_tournament_matches(url, all_rounds)
+    
+    if all_rounds is None:
+        return None
+    
+    return cached_process(all_rounds)
+
+def _scrape_tournament(url):
+    """Matches of every round in round order, fetched concurrently, and whether the tournament is finished.
+    
+    The matches are None if no round has data. Finished means every round fetch succeeded,
+    the rounds with data run 1..N without gaps, a later round was checked and has nothing,
+    and every match of round N has a winner. That also holds between rounds, so it is
+    only trusted for TOURNAMENT_CACHE_TTL.
+    """
+    round_frames = {}
+    failed = False
+    
+    executor = scrape_pool()
+    futures = {
+        executor.submit(cached_scrape, url, round_num): round_num
+        for round_num in range(1, MAX_ROUNDS + 1)
+    }
+    
+    # Each round becomes a frame as it arrives, so no combined list of dicts is built
+    for future in as_completed(futures):
+        round_num = futures[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            st.warning(f"Error in Round {round_num}: {str(e)}")
+            failed = True
+            continue
+        if result:
+            round_frames[round_num] = pd.DataFrame(result)
+    
+    if not round_frames:
+        return None, False
+    
+    last_round = max(round_frames)
+    finished = (
+        not failed
+        and len(round_frames) == last_round < MAX_ROUNDS
+        and round_frames[last_round]['Winner'].notna().all()
+    )
+    
+    # Keep matches in round order regardless of completion order
+    all_rounds = pd.concat([round_frames[round_num] for round_num in sorted(round_frames)], ignore_index=True)
+    return all_rounds, finished
+
+def normalize_tournament_url(url):
+    """Drop whitespace, query and fragment and end with one slash, so equivalent URLs share a cache key."""
+    url = url.strip().split('#', 1)[0].split('?', 1)[0]
+    return url.rstrip('/') + '/'
+
+def tournament_name_from_url(url):
+    return url.split('/')[-3].replace('-', ' ').title()
+
 def analyze_tournament(url):
-    with st.spinner(f"Scraping {url.split('/')[-3].replace('-',' ').title()}..."):
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        all_rounds = []
-        
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for round_num in range(1, 21):
-                futures.append(executor.submit(cached_scrape, url, round_num))
-            
-            for i, future in enumerate(futures):
-                progress_bar.progress((i + 1) / 20)
-                status_text.text(f"Processing Round {i+1}/20")
-                result = future.result()
-                if result:
-                    all_rounds.extend(result)
-        
-        progress_bar.empty()
-        status_text.empty()
+    tournament_name = tournament_name_from_url(url)
+    
+    # Cached elements can't drive a progress bar created outside them, so a spinner is shown instead
+    with st.spinner(f"Scraping {tournament_name}..."):
+        data = _analyze_tournament_cached(url)
+    
+    if data is None:
+        st.error(f"No data found for {url}")
+        return None
+    
+    return data, tournament_name
+
+MAX_PARALLEL_TOURNAMENTS = 5
+
+def analyze_tournaments(urls, on_progress=None):
+    """Analyze several tournaments concurrently; returns (data, name) pairs in input order."""
+    datasets = {}
+    
+    # Each tournament already fans out over its rounds, so only a few run side by side
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_TOURNAMENTS) as executor:
+        futures = {executor.submit(_analyze_tournament_cached, url): i for i, url in enumerate(urls)}
         
-        if not all_rounds:
+        for done, future in enumerate(as_completed(futures), 1):
+            datasets[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, len(urls))
+    
+    results = []
+    for i, url in enumerate(urls):
+        if datasets[i] is None:
             st.error(f"No data found for {url}")
-            return None
-        
-        tournament_name = url.split('/')[-3].replace('-', ' ').title()
-        
-        with st.spinner("Analyzing matches..."):
-            return cached_process(all_rounds), tournament_name
+        else:
+            results.append((datasets[i], tournament_name_from_url(url)))
+    return results
 
 
+DECK_SECTION_TITLES = {'Hero / Weapon / Equipment', 'Pitch 0', 'Pitch 1', 'Pitch 2', 'Pitch 3'}
+
 @st.cache_data(ttl=3600)
 def fetch_decklist(url):
     """Fetch and parse a decklist page with image URLs."""
     try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        response = SESSION.get(url)
+        # Only the deck tables are needed, so lxml builds just those subtrees
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=SoupStrainer('table'))
         
         def extract_cards(table_soup):
             cards = []
@@ -314,89 +674,140 @@ def fetch_decklist(url):
                     })
             return cards
         
+        # Index the section tables by header in one pass instead of a tree scan per section
+        sections = {}
+        for th in soup.find_all('th'):
+            if th.string in DECK_SECTION_TITLES and th.string not in sections:
+                sections[th.string] = th.find_parent('table')
+        
         # Extract hero/equipment
         hero_equip = []
-        hero_table = soup.find('th', string='Hero / Weapon / Equipment')
-        if hero_table:
-            hero_equip = extract_cards(hero_table.find_parent('table'))
+        hero_table = sections.get('Hero / Weapon / Equipment')
+        if hero_table is not None:
+            hero_equip = extract_cards(hero_table)
         
         # Extract cards by pitch value
         deck = {'Hero/Equipment': hero_equip}
         for pitch in ['0', '1', '2', '3']:
-            pitch_table = soup.find('th', string=f'Pitch {pitch}')
-            if pitch_table:
-                deck[f'Pitch {pitch}'] = extract_cards(pitch_table.find_parent('table'))
+            pitch_table = sections.get(f'Pitch {pitch}')
+            if pitch_table is not None:
+                deck[f'Pitch {pitch}'] = extract_cards(pitch_table)
         
         return deck
     except Exception as e:
         st.error(f"Error fetching decklist: {str(e)}")
         return None
 
-def create_hoverable_card(card):
-    """Generate HTML for a hoverable card with proper escaping."""
-    img_id = card['large_img'].split('/')[-1].replace("'", "")
-    return f"""
-    <div style="position:relative; display:inline-block; margin:5px;">
-        <a href="#" style="text-decoration:none; color:inherit;"
-           onmouseover="document.getElementById('img-{img_id}').style.display='block'"
-           onmouseout="document.getElementById('img-{img_id}').style.display='none'">
-            {card['quantity']} x {card['text']}
-        </a>
-        <img id="img-{img_id}" 
-             src="{card['large_img']}" 
-             style="position:absolute; display:none; z-index:1000; 
+# Column mappings for the two players of a match onto one decklist row layout
+DECKLIST_SIDES = (
+    {'Player 1 Name': 'Player', 'Player 1 Hero': 'Hero', 'Player 1 Decklist': 'Decklist URL'},
+    {'Player 2 Name': 'Player', 'Player 2 Hero': 'Hero', 'Player 2 Decklist': 'Decklist URL'}
+)
+
+def decklist_rows(match_results, tournament):
+    """Collect (Player, Hero, Decklist URL) from both sides of every match that has a decklist."""
+    sides = [match_results[list(cols)].rename(columns=cols) for cols in DECKLIST_SIDES]
+    
+    # Stable sort on the shared match index interleaves player 1 and player 2 in match order
+    rows = pd.concat(sides).sort_index(kind='stable')
+    rows = rows[rows['Decklist URL'].notna() & (rows['Decklist URL'] != '')]
+    return rows.assign(Tournament=tournament)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _decklist_table(_single_df, _multi_df, single_name, single_digest, names, digests):
+    """Unique decklists across the loaded tournaments; keyed on their names and content digests."""
+    frames = []
+    
+    # Single tournament data
+    if _single_df:
+        frames.append(decklist_rows(_single_df['1_match_results'], single_name))
+    
+    # Multi-tournament data
+    for df, tournament in zip(_multi_df, names):
+        frames.append(decklist_rows(df['1_match_results'], tournament))
+    
+    # Remove duplicates (same player may appear in multiple rounds)
+    table = pd.concat(frames, ignore_index=True).drop_duplicates(['Player', 'Hero', 'Decklist URL'])
+    
+    # Categories double as the filter options, so reruns never rescan the rows for them
+    table['Tournament'] = pd.Categorical(table['Tournament'], categories=pd.unique(table['Tournament']))
+    table['Hero'] = table['Hero'].astype('category').cat.remove_unused_categories()
+    return table
+
+# Cards render inside a components iframe, so the hover rules ship with the deck HTML
+_CARD_STYLE = """
+<style>
+    .hover-card { position:relative; display:inline-block; margin:5px; }
+    .hover-card a { text-decoration:none; color:inherit; transition: all 0.3s ease; }
+    .hover-card:hover a { color: #4a8bfc; }
+    .card-preview { position:absolute; display:none; z-index:1000;
                     width:250px; left:50%; transform:translateX(-50%);
-                    border:2px solid #ddd; border-radius:5px; box-shadow:0 0 10px rgba(0,0,0,0.3);"/>
+                    border:2px solid #ddd; border-radius:5px; box-shadow:0 0 10px rgba(0,0,0,0.3); }
+    .hover-card:hover .card-preview { display:block; }
+</style>
+"""
+
+# Hidden lazy images are only fetched once hovered into view
+_CARD_TMPL = """
+    <div class="hover-card">
+        <a href="#">{quantity} x {text}</a>
+        <img class="card-preview" loading="lazy" decoding="async" src="{large_img}"/>
     </div>
     """
 
+def create_hoverable_card(card):
+    """Generate HTML for a hoverable card with proper escaping."""
+    return _CARD_TMPL.format_map(card)
+
+def cards_html(cards):
+    """Join the hoverable cards of one deck section into a single block."""
+    return "<div style='line-height:2.0;'>" + ''.join(map(create_hoverable_card, cards)) + "</div>"
+
+# Above this many card entries the hover previews cost more markup than they're worth
+HOVER_DECK_MAX_CARDS = 40
+
 def display_decklist(deck):
     """Display a decklist with hoverable card images."""
     if not deck:
         st.warning("No decklist data available")
         return
     
-    # Display Hero & Equipment
-    st.subheader("Hero & Equipment")
+    if sum(len(cards) for cards in deck.values()) > HOVER_DECK_MAX_CARDS:
+        st.dataframe(
+            pd.DataFrame([
+                {'Section': section, 'Qty': card['quantity'], 'Card': card['text'], 'Image': card['large_img']}
+                for section, cards in deck.items()
+                for card in cards
+            ]),
+            column_config={'Image': st.column_config.LinkColumn('Image', display_text='View')},
+            use_container_width=True,
+            hide_index=True
+        )
+        return
+    
+    # All sections share one iframe; headings are rendered inside it
+    sections = ["<h3>Hero & Equipment</h3>"]
+    rows = 1
     if deck.get('Hero/Equipment'):
-        hero_html = "<div style='line-height:2.0;'>"
-        for card in deck['Hero/Equipment']:
-            hero_html += create_hoverable_card(card)
-        hero_html += "</div>"
-        components.html(hero_html, height=50*len(deck['Hero/Equipment']))
+        sections.append(cards_html(deck['Hero/Equipment']))
+        rows += len(deck['Hero/Equipment'])
     else:
-        st.write("No hero/equipment data")
+        sections.append("<p>No hero/equipment data</p>")
+        rows += 1
     
-    # Display cards by pitch value
+    # Cards by pitch value
     for pitch in ['0', '1', '2', '3']:
         pitch_key = f'Pitch {pitch}'
         if pitch_key in deck:
-            st.subheader(f"Pitch {pitch} Cards")
-            cards_html = "<div style='line-height:2.0;'>"
-            for card in deck[pitch_key]:
-                cards_html += create_hoverable_card(card)
-            cards_html += "</div>"
-            components.html(cards_html, height=50*len(deck[pitch_key]))
+            sections.append(f"<h3>Pitch {pitch} Cards</h3>")
+            sections.append(cards_html(deck[pitch_key]))
+            rows += 1 + len(deck[pitch_key])
+    
+    components.html(_CARD_STYLE + ''.join(sections), height=50*rows, scrolling=True)
 
 
 # ============== MAIN APP ==============
 def main():
-
-    st.markdown("""
-    <script>
-        function showCard(imgId) {
-            document.getElementById(imgId).style.display = 'block';
-        }
-        function hideCard(imgId) {
-            document.getElementById(imgId).style.display = 'none';
-        }
-    </script>
-    <style>
-        .hover-card { transition: all 0.3s ease; }
-        .hover-card:hover { color: #4a8bfc; }
-    </style>
-    """, unsafe_allow_html=True)
-        
     st.title("Flesh and Blood GG Tournament Analyzer")
     
     # ===== SIDEBAR CONTROLS =====
@@ -412,11 +823,12 @@ def main():
         )
         
         if st.button("Analyze Tournament", key="analyze_single"):
-            result = analyze_tournament(url)
+            result = analyze_tournament(normalize_tournament_url(url))
             if result is not None:
                 st.session_state.df = result[0]
                 st.session_state.tournament_name = result[1]
                 st.session_state.match_count = len(result[0]['1_match_results'])
+                st.session_state.df_digest = dataset_digest(result[0])
                 st.success("Analysis complete!")
         
         # Multi-Tournament Comparison
@@ -428,21 +840,26 @@ def main():
         )
         
         if st.button("Compare Tournaments", key="analyze_multi"):
-            urls = [u.strip() for u in multi_urls.split('\n') if u.strip()]
+            # Normalize and dedupe (keeping order) so a repeated URL is only analyzed once
+            urls = list(dict.fromkeys(
+                normalize_tournament_url(u) for u in multi_urls.splitlines() if u.strip()
+            ))
             st.session_state.multi_df = []
             st.session_state.tournament_names = []
+            st.session_state.multi_digests = []
             
             progress_text = st.empty()
             progress_bar = st.progress(0)
             
-            for i, url in enumerate(urls):
-                progress_text.text(f"Processing {i+1}/{len(urls)}")
-                progress_bar.progress((i + 1) / len(urls))
-                
-                result = analyze_tournament(url)
-                if result:
-                    st.session_state.multi_df.append(result[0])
-                    st.session_state.tournament_names.append(result[1])
+            def show_progress(done, total):
+                progress_text.text(f"Processed {done}/{total}")
+                progress_bar.progress(done / total)
+            
+            for data, tournament_name in analyze_tournaments(urls, show_progress):
+                st.session_state.multi_df.append(data)
+                st.session_state.tournament_names.append(tournament_name)
+                # Hashed once here, so cached views key on content rather than names alone
+                st.session_state.multi_digests.append(dataset_digest(data))
             
             progress_bar.empty()
             progress_text.empty()
@@ -455,9 +872,10 @@ def main():
         # Data Export
         st.subheader("💾 Data Export")
         if st.session_state.df:
-            json_data = json.dumps(
-                {k: v.to_dict(orient='records') for k, v in st.session_state.df.items()},
-                indent=2
+            json_data = _serialize_json(
+                st.session_state.df,
+                st.session_state.tournament_name,
+                st.session_state.df_digest
             )
             st.download_button(
                 label="Download JSON",
@@ -480,29 +898,20 @@ def main():
             st.header(f"📊 {st.session_state.tournament_name} Analysis")
             st.metric("Total Matches Analyzed", st.session_state.match_count)
             
-            plot_hero_performance(st.session_state.df)
+            plot_hero_performance(st.session_state.df, "single")
             
-            with st.expander("Detailed Hero Stats"):
-                st.dataframe(
-                    st.session_state.df['3_hero_stats'].sort_values('Win Rate (%)', ascending=False),
-                    use_container_width=True,
-                    height=400
-                )
+            lazy_dataframe("Detailed Hero Stats", st.session_state.df['3_hero_stats'], "single_hero_stats")
             
             plot_matchup_heatmap(st.session_state.df, "single")
             
             plot_player_performance(st.session_state.df)
     
     with tab2:
-        plot_multi_tournament_comparison()
+        # Reuse the combined hero stats the comparison was drawn from
+        combined = plot_multi_tournament_comparison()
         
-        if len(st.session_state.multi_df) > 1:
-            with st.expander("Raw Comparison Data"):
-                combined = pd.concat([
-                    df['3_hero_stats'].assign(Tournament=name)
-                    for df, name in zip(st.session_state.multi_df, st.session_state.tournament_names)
-                ])
-                st.dataframe(combined, use_container_width=True, height=400)
+        if combined is not None:
+            lazy_dataframe("Raw Comparison Data", combined, "raw_comparison")
 
     with tab3:
         plot_aggregated_analysis()
@@ -513,72 +922,39 @@ def main():
         if not st.session_state.df and not st.session_state.multi_df:
             st.warning("Please analyze a tournament first")
         else:
-            # Get all decklist data
-            decklist_data = []
-            
-            # Single tournament data
-            if st.session_state.df:
-                df = st.session_state.df['1_match_results']
-                tournament = st.session_state.tournament_name
-                for _, row in df.iterrows():
-                    if row['Player 1 Decklist']:
-                        decklist_data.append({
-                            'Player': row['Player 1 Name'],
-                            'Hero': row['Player 1 Hero'],
-                            'Decklist URL': row['Player 1 Decklist'],
-                            'Tournament': tournament
-                        })
-                    if row['Player 2 Decklist']:
-                        decklist_data.append({
-                            'Player': row['Player 2 Name'],
-                            'Hero': row['Player 2 Hero'],
-                            'Decklist URL': row['Player 2 Decklist'],
-                            'Tournament': tournament
-                        })
-            
-            # Multi-tournament data
-            for df, tournament in zip(st.session_state.multi_df, st.session_state.tournament_names):
-                for _, row in df['1_match_results'].iterrows():
-                    if row['Player 1 Decklist']:
-                        decklist_data.append({
-                            'Player': row['Player 1 Name'],
-                            'Hero': row['Player 1 Hero'],
-                            'Decklist URL': row['Player 1 Decklist'],
-                            'Tournament': tournament
-                        })
-                    if row['Player 2 Decklist']:
-                        decklist_data.append({
-                            'Player': row['Player 2 Name'],
-                            'Hero': row['Player 2 Hero'],
-                            'Decklist URL': row['Player 2 Decklist'],
-                            'Tournament': tournament
-                        })
+            # Get all decklist data (rebuilt only when the loaded tournaments change)
+            single_name = st.session_state.tournament_name if st.session_state.df else None
+            decklist_df = _decklist_table(
+                st.session_state.df,
+                st.session_state.multi_df,
+                single_name,
+                st.session_state.df_digest,
+                *multi_cache_key()
+            )
             
-            if not decklist_data:
+            if decklist_df.empty:
                 st.warning("No decklist data available")
                 return
             
-            # Remove duplicates
-            unique_decklists = {}
-            for entry in decklist_data:
-                key = (entry['Player'], entry['Hero'], entry['Decklist URL'])
-                unique_decklists[key] = entry
-            decklist_df = pd.DataFrame(unique_decklists.values())
+            tournaments = decklist_df['Tournament'].cat.categories.tolist()
+            heroes = decklist_df['Hero'].cat.categories.tolist()
             
-            # Filter controls
-            col1, col2 = st.columns(2)
-            with col1:
-                tournament_filter = st.multiselect(
-                    "Filter by tournament",
-                    options=decklist_df['Tournament'].unique(),
-                    default=decklist_df['Tournament'].unique()
-                )
-            with col2:
-                hero_filter = st.multiselect(
-                    "Filter by hero",
-                    options=decklist_df['Hero'].unique(),
-                    default=decklist_df['Hero'].unique()
-                )
+            # Filter controls; the player list below refreshes once the filters are applied
+            with st.form(key="decklist_filter_form"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    tournament_filter = st.multiselect(
+                        "Filter by tournament",
+                        options=tournaments,
+                        default=tournaments
+                    )
+                with col2:
+                    hero_filter = st.multiselect(
+                        "Filter by hero",
+                        options=heroes,
+                        default=heroes
+                    )
+                st.form_submit_button("Apply filters")
             
             # Apply filters
             filtered = decklist_df[
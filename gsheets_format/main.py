@@ -1,9 +1,22 @@
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
+import numpy as np
 import pandas as pd
-from collections import defaultdict
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import os
-import re
+
+# One pooled session for every request, so concurrent round scrapes reuse connections;
+# responses are cached on disk and revalidated with ETag/Last-Modified once they expire
+SESSION = requests_cache.CachedSession('fab_cache', cache_control=True, expire_after=3600)
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=20, pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+))
 
 def get_tournament_url():
     """Prompt user for tournament URL and validate format."""
@@ -26,44 +39,60 @@ def get_tournament_url():
         # Test the base URL
         test_url = f"{url}1/"  # Test with round 1
         try:
-            response = requests.head(test_url, timeout=5)
+            response = SESSION.head(test_url, timeout=5, allow_redirects=True)
             if response.status_code == 200:
                 return url
             print(f"Couldn't access tournament data (HTTP {response.status_code}). Please check the URL.")
         except requests.RequestException:
             print("Invalid URL or couldn't connect. Please try again.")
 
-def scrape_round(base_url, round_num):
+def has_class(css_class):
+    """XPath predicate for css_class as one token of @class, as BeautifulSoup's class_ matches."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')"
+
+# Compiled once and reused for every row; comments are dropped so text matches get_text()
+HTML_PARSER = etree.HTMLParser(encoding='utf-8', remove_comments=True)
+RESULT_ROWS = etree.XPath(f"//div[{has_class('tournament-coverage__row--results')}]")
+ROW_PLAYERS = etree.XPath(f".//div[{has_class('tournament-coverage__player')}]")
+PLAYER_NAME = etree.XPath("(.//span)[1]")
+PLAYER_HERO = etree.XPath(f"(.//div[{has_class('tournament-coverage__player-hero-and-deck')}])[1]")
+DECKLIST_HREF = etree.XPath("(.//a[@href])[1]/@href")
+WINNER_CLASS = 'tournament-coverage__player--winner'
+
+def element_text(element):
+    """Text of an element and its descendants, each piece stripped, like get_text(strip=True)."""
+    return ''.join(text.strip() for text in element.itertext())
+
+def parse_player(player):
+    """Name, hero, decklist URL and winner flag of one player block."""
+    hero_div = PLAYER_HERO(player)[0]
+    decklist = DECKLIST_HREF(hero_div)
+    return (
+        element_text(PLAYER_NAME(player)[0]),
+        element_text(hero_div).replace("View decklist", "").strip(),
+        f"https://fabtcg.com{decklist[0]}" if decklist else None,
+        WINNER_CLASS in player.get('class', '').split()
+    )
+
+def scrape_round(base_url, round_num, session=SESSION):
     """Scrape match data for a specific round including decklist URLs."""
     url = f"{base_url}{round_num}/"
-    soup = fetch_page(url)
-    if not soup:
+    response = session.get(url)
+    if response.status_code != 200:
         return None
+    tree = etree.fromstring(response.content, HTML_PARSER)
     
     matches = []
-    match_rows = soup.find_all('div', class_='tournament-coverage__row--results')
-    
-    for row in match_rows:
-        players = row.find_all('div', class_='tournament-coverage__player')
+    for row in RESULT_ROWS(tree):
+        players = ROW_PLAYERS(row)
         if len(players) >= 2:
-            # Player 1 data
-            p1_name = players[0].find('span').get_text(strip=True)
-            p1_hero_div = players[0].find('div', class_='tournament-coverage__player-hero-and-deck')
-            p1_hero = p1_hero_div.get_text(strip=True).replace("View decklist", "").strip()
-            p1_decklist = p1_hero_div.find('a', href=True)
-            p1_decklist_url = f"https://fabtcg.com{p1_decklist['href']}" if p1_decklist else None
-            
-            # Player 2 data
-            p2_name = players[1].find('span').get_text(strip=True)
-            p2_hero_div = players[1].find('div', class_='tournament-coverage__player-hero-and-deck')
-            p2_hero = p2_hero_div.get_text(strip=True).replace("View decklist", "").strip()
-            p2_decklist = p2_hero_div.find('a', href=True)
-            p2_decklist_url = f"https://fabtcg.com{p2_decklist['href']}" if p2_decklist else None
+            p1_name, p1_hero, p1_decklist_url, p1_won = parse_player(players[0])
+            p2_name, p2_hero, p2_decklist_url, p2_won = parse_player(players[1])
             
             winner = None
-            if 'tournament-coverage__player--winner' in players[0]['class']:
+            if p1_won:
                 winner = p1_name
-            elif 'tournament-coverage__player--winner' in players[1]['class']:
+            elif p2_won:
                 winner = p2_name
             
             matches.append({
@@ -78,42 +107,27 @@ def scrape_round(base_url, round_num):
 def extract_decklists(data_frames, base_url):
     """Extract decklist information and save to separate CSV."""
     tournament_name = base_url.split('/')[-3].replace('-', ' ').title()
-    decklist_data = []
     
-    # Process match results to get all players and their decklists
-    for _, row in data_frames['1_match_results'].iterrows():
-        # Player 1
-        decklist_data.append({
-            'player_name': row['Player 1 Name'],
-            'hero': row['Player 1 Hero'],
-            'decklist_url': row['Player 1 Decklist'],
-            'tournament': tournament_name
-        })
-        
-        # Player 2
-        decklist_data.append({
-            'player_name': row['Player 2 Name'],
-            'hero': row['Player 2 Hero'],
-            'decklist_url': row['Player 2 Decklist'],
-            'tournament': tournament_name
-        })
+    # Both sides of every match as column slices, interleaved back into match order
+    match_results = data_frames['1_match_results']
+    sides = [
+        match_results[[f'Player {n} Name', f'Player {n} Hero', f'Player {n} Decklist']]
+        .set_axis(['player_name', 'hero', 'decklist_url'], axis=1)
+        for n in (1, 2)
+    ]
     
     # Remove duplicates (same player may appear in multiple rounds)
-    unique_decklists = {}
-    for entry in decklist_data:
-        key = (entry['player_name'], entry['hero'], entry['decklist_url'])
-        unique_decklists[key] = entry
+    df = (
+        pd.concat(sides)
+        .sort_index(kind='stable')
+        .drop_duplicates()
+        .assign(tournament=tournament_name)
+    )
     
-    # Create DataFrame and save to CSV
-    df = pd.DataFrame(unique_decklists.values())
+    # Save to CSV
     df.to_csv('decklists.csv', index=False)
     print(f"\nSaved decklist information to 'decklists.csv'")
 
-def fetch_page(url):
-    """Fetch webpage and return BeautifulSoup object."""
-    response = requests.get(url)
-    return BeautifulSoup(response.text, 'html.parser') if response.status_code == 200 else None
-
 # def scrape_round(round_num):
 #     """Scrape match data for a specific round."""
 #     soup = fetch_page(BASE_URL.format(round_num))
@@ -144,92 +158,105 @@ def fetch_page(url):
 #             })
 #     return matches
 
+def tally_heroes(winning_heroes, losing_heroes):
+    """Count hero and matchup results for decided matches with numpy bincounts."""
+    # Interleave winner/loser so factorize numbers heroes in first-appearance order
+    sides = np.empty(2 * len(winning_heroes), dtype=object)
+    sides[0::2] = winning_heroes
+    sides[1::2] = losing_heroes
+    codes, heroes = pd.factorize(sides)
+    winners, losers = codes[0::2], codes[1::2]
+    n = len(heroes)
+    
+    wins = np.bincount(winners, minlength=n)
+    losses = np.bincount(losers, minlength=n)
+    total = wins + losses
+    hero_stats_df = pd.DataFrame({
+        'Hero': heroes,
+        'Wins': wins,
+        'Losses': losses,
+        'Total Matches': total,
+        'Win Rate (%)': np.round(wins / total * 100, 2)
+    })
+    
+    # pair_wins[h, o] = wins of hero h against opponent o
+    pair_wins = np.bincount(winners * n + losers, minlength=n * n).reshape(n, n)
+    
+    # Each match adds (winner, loser) then (loser, winner); list pairs per hero in that order
+    pair_seq = np.empty(2 * len(winners), dtype=np.int64)
+    pair_seq[0::2] = winners * n + losers
+    pair_seq[1::2] = losers * n + winners
+    pairs = pd.unique(pair_seq)
+    pairs = pairs[np.argsort(pairs // n, kind='stable')]
+    hero_idx, opp_idx = pairs // n, pairs % n
+    
+    matchup_wins = pair_wins[hero_idx, opp_idx]
+    matchup_losses = pair_wins[opp_idx, hero_idx]
+    matchup_total = matchup_wins + matchup_losses
+    hero_matchups_df = pd.DataFrame({
+        'Hero': heroes[hero_idx],
+        'Opponent Hero': heroes[opp_idx],
+        'Wins': matchup_wins,
+        'Losses': matchup_losses,
+        'Total Matches': matchup_total,
+        'Win Rate (%)': np.round(matchup_wins / matchup_total * 100, 2)
+    })
+    
+    return hero_stats_df, hero_matchups_df
+
 def process_data(matches):
-    """Process all tournament data and return organized DataFrames."""
-    # Initialize data structures
-    player_stats = defaultdict(lambda: {'wins': 0, 'losses': 0, 'heroes_used': set()})
-    hero_stats = defaultdict(lambda: {'wins': 0, 'losses': 0, 'matchups': defaultdict(lambda: {'wins': 0, 'losses': 0})})
-    all_player_details = []
-    all_matches = []
+    """Process all tournament data and return organized DataFrames.
     
-    for match in matches:
-        p1, p2 = match['Player 1 Name'], match['Player 2 Name']
-        h1, h2 = match['Player 1 Hero'], match['Player 2 Hero']
-        winner = match['Winner']
-        
-        # Track match results
-        all_matches.append(match)
-        
-        # Track player stats
-        player_stats[p1]['heroes_used'].add(h1)
-        player_stats[p2]['heroes_used'].add(h2)
-        
-        # Track hero stats
-        if winner == p1:
-            player_stats[p1]['wins'] += 1
-            player_stats[p2]['losses'] += 1
-            hero_stats[h1]['wins'] += 1
-            hero_stats[h2]['losses'] += 1
-            hero_stats[h1]['matchups'][h2]['wins'] += 1
-            hero_stats[h2]['matchups'][h1]['losses'] += 1
-        elif winner == p2:
-            player_stats[p2]['wins'] += 1
-            player_stats[p1]['losses'] += 1
-            hero_stats[h2]['wins'] += 1
-            hero_stats[h1]['losses'] += 1
-            hero_stats[h2]['matchups'][h1]['wins'] += 1
-            hero_stats[h1]['matchups'][h2]['losses'] += 1
-        
-        # Combine player details
-        all_player_details.append({
-            'Player': p1, 'Hero': h1,
-            'Round': match['Round'],
-            'Opponent': p2, 'Opponent Hero': h2,
-            'Result': 'Win' if winner == p1 else 'Loss'
-        })
-        all_player_details.append({
-            'Player': p2, 'Hero': h2,
-            'Round': match['Round'],
-            'Opponent': p1, 'Opponent Hero': h1,
-            'Result': 'Win' if winner == p2 else 'Loss'
-        })
+    Accepts a list of match dicts from scrape_round or an equivalent DataFrame.
+    """
+    # Track match results; a DataFrame passes through without a dict round-trip
+    match_results_df = pd.DataFrame(matches)
     
-    # Create DataFrames
-    match_results_df = pd.DataFrame(all_matches)
+    p1, p2 = match_results_df['Player 1 Name'], match_results_df['Player 2 Name']
+    h1, h2 = match_results_df['Player 1 Hero'], match_results_df['Player 2 Hero']
+    winner = match_results_df['Winner']
     
-    player_stats_df = pd.DataFrame([{
-        'Player': player,
-        'Wins': stats['wins'],
-        'Losses': stats['losses'],
-        'Win Rate (%)': round(stats['wins'] / (stats['wins'] + stats['losses']) * 100, 2) if (stats['wins'] + stats['losses']) > 0 else 0,
-        'Heroes Used': ', '.join(stats['heroes_used'])
-    } for player, stats in player_stats.items()])
+    # Player 1 takes precedence, as it did in the old per-match if/elif
+    p1_won = (winner == p1).to_numpy()
+    p2_won = (winner == p2).to_numpy() & ~p1_won
     
-    hero_stats_df = pd.DataFrame([{
-        'Hero': hero,
-        'Wins': stats['wins'],
-        'Losses': stats['losses'],
-        'Total Matches': stats['wins'] + stats['losses'],
-        'Win Rate (%)': round(stats['wins'] / (stats['wins'] + stats['losses']) * 100, 2) if (stats['wins'] + stats['losses']) > 0 else 0
-    } for hero, stats in hero_stats.items()])
+    # Combine player details; a stable sort on the match index puts each player 2 row after its player 1 row
+    sides = [
+        pd.DataFrame({
+            'Player': player, 'Hero': hero,
+            'Round': match_results_df['Round'],
+            'Opponent': opponent, 'Opponent Hero': opponent_hero,
+            'Result': np.where(winner == player, 'Win', 'Loss')
+        })
+        for player, hero, opponent, opponent_hero in ((p1, h1, p2, h2), (p2, h2, p1, h1))
+    ]
+    player_details_df = pd.concat(sides).sort_index(kind='stable').reset_index(drop=True)
     
-    # Prepare hero matchup data
-    matchup_data = []
-    for hero, stats in hero_stats.items():
-        for opponent, matchup in stats['matchups'].items():
-            total = matchup['wins'] + matchup['losses']
-            if total > 0:
-                matchup_data.append({
-                    'Hero': hero,
-                    'Opponent Hero': opponent,
-                    'Wins': matchup['wins'],
-                    'Losses': matchup['losses'],
-                    'Total Matches': total,
-                    'Win Rate (%)': round(matchup['wins'] / total * 100, 2)
-                })
-    hero_matchups_df = pd.DataFrame(matchup_data)
+    # Track player stats; losses only count matches the opponent actually won
+    won = np.column_stack([p1_won, p2_won]).ravel()
+    lost = np.column_stack([p2_won, p1_won]).ravel()
+    codes, players = pd.factorize(player_details_df['Player'], use_na_sentinel=False)
+    wins = np.bincount(codes, weights=won, minlength=len(players)).astype(np.int64)
+    losses = np.bincount(codes, weights=lost, minlength=len(players)).astype(np.int64)
+    total = wins + losses
+    heroes_used = (
+        player_details_df.drop_duplicates(['Player', 'Hero'])
+        .groupby('Player', sort=False, dropna=False)['Hero']
+        .agg(', '.join)
+    )
+    player_stats_df = pd.DataFrame({
+        'Player': players,
+        'Wins': wins,
+        'Losses': losses,
+        'Win Rate (%)': np.round(np.divide(wins * 100, total, out=np.zeros(len(players)), where=total > 0), 2),
+        'Heroes Used': heroes_used.reindex(players).to_numpy()
+    })
     
-    player_details_df = pd.DataFrame(all_player_details)
+    # Hero tallies are counted over decided matches only
+    decided = p1_won | p2_won
+    winning_heroes = np.where(p1_won, h1, h2)[decided]
+    losing_heroes = np.where(p1_won, h2, h1)[decided]
+    hero_stats_df, hero_matchups_df = tally_heroes(winning_heroes, losing_heroes)
     
     return {
         '1_match_results': match_results_df,
@@ -247,7 +274,8 @@ def save_to_csv(data_frames, output_dir):
     for name, df in data_frames.items():
         filename = f"{name}.csv"
         filepath = os.path.join(output_dir, filename)
-        df.to_csv(filepath, index=False)
+        # Arrow's C++ writer; string fields come out quoted, which readers treat the same
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), filepath)
         print(f"Saved {filename}")
 
 def main():
@@ -259,25 +287,19 @@ def main():
     all_rounds = []
     print("\nScraping tournament data...")
     
-    max_attempts = 3
-    found_rounds = 0
+    # Rounds are fetched concurrently over the shared session, then reported in order
+    rounds = range(1, 21)  # Check up to 20 rounds
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = executor.map(lambda round_num: scrape_round(BASE_URL, round_num), rounds)
     
-    for round_num in range(1, 21):  # Check up to 20 rounds
-        if max_attempts == 0:
-            break
-            
-        print(f"  Round {round_num}...", end=' ', flush=True)
-        round_matches = scrape_round(BASE_URL, round_num)
-        
+    found_rounds = 0
+    for round_num, round_matches in zip(rounds, results):
         if not round_matches:
-            print("no data")
-            max_attempts -= 1
             continue
-            
+        
         all_rounds.extend(round_matches)
         found_rounds += 1
-        max_attempts = 3  # Reset attempts if we found data
-        print(f"{len(round_matches)} matches")
+        print(f"  Round {round_num}... {len(round_matches)} matches")
     
     if not all_rounds:
         print("\nNo tournament data found. Please check the URL and try again.")
@@ -1,28 +1,57 @@
-import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import urljoin
+import re
 from datetime import datetime
+import calendar
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+# One pooled session with the browser headers set once; event pages are fetched concurrently.
+# Unchanged pages come back as 304s against the cached ETag/Last-Modified on repeat runs
+SESSION = requests_cache.CachedSession('fab_cache', cache_control=True, expire_after=3600)
+SESSION.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+EVENT_WORKERS = 16
+
+def class_strainer(tag, css_class):
+    """SoupStrainer for tags carrying css_class among their other classes."""
+    # While parsing, the strainer sees the raw class attribute rather than the split list
+    return SoupStrainer(tag, class_=re.compile(rf'(?:^|\s){re.escape(css_class)}(?:\s|$)'))
+
+# Each page is only searched inside these blocks, so nothing else is built into the tree
+LISTBLOCK_ITEMS = class_strainer('div', 'listblock-item')
+MONTH_SECTIONS = class_strainer('div', 'block-pageLinkBlockWithURL')
+
+MONTH_NAMES = ('january', 'february', 'march', 'april', 'may', 'june',
+               'july', 'august', 'september', 'october', 'november', 'december')
+RESOURCES_TITLE = 'Pairings, Results, and Standings'
+
+def is_resources_title(text):
+    return text is not None and RESOURCES_TITLE in text
+
+# "Oct 24, 2025", "Oct 24-26, 2025", "Oct 24 – 26, 2025" or "Oct 30 - Nov 2, 2025":
+# first month, first day, optional last month, last day, year
+DATE_PATTERN = re.compile(r'^([A-Za-z]+)\s+(\d+)(?:\s*[-–]\s*(?:([A-Za-z]+)\s+)?(\d+))?\s*,\s*(\d{4})$')
+
+# Abbreviated month name -> number, matched case-insensitively like strptime's %b
+MONTH_NUMBERS = {name.lower(): number for number, name in enumerate(calendar.month_abbr) if name}
+
+@lru_cache(maxsize=None)
 def parse_event_date(date_str):
     """Parse event date string into datetime object"""
     try:
-        # Handle date ranges like "Oct 24-26, 2025" or single dates like "Oct 24, 2025"
-        date_part = date_str.split(',')[-1].strip()  # Get the year part
-        year = int(date_part)
-        
-        # Find month and day
-        month_day_part = date_str.split(',')[0]
-        if '-' in month_day_part:
-            # Date range - take the last day
-            day = int(month_day_part.split('-')[-1].strip().split()[-1])
-        else:
-            # Single date
-            day = int(month_day_part.strip().split()[-1])
-        
-        month_str = month_day_part.strip().split()[0]
-        month = datetime.strptime(month_str, '%b').month
-        
-        return datetime(year, month, day).date()
+        match = DATE_PATTERN.match(date_str.strip())
+        if not match:
+            raise ValueError("unrecognized format")
+        first_month, first_day, last_month, last_day, year = match.groups()
+        
+        # Date range - take the last day, in the second month when the range crosses one
+        day = int(last_day or first_day)
+        month = MONTH_NUMBERS[(last_month or first_month).lower()]
+        
+        return datetime(int(year), month, day).date()
     except Exception as e:
         print(f"Could not parse date '{date_str}': {e}")
         return None
@@ -34,6 +63,12 @@ def is_past_event(event_date_str):
         return False  # If we can't parse, assume it's upcoming
     return event_date < datetime.now().date()
 
+def mark_past_events(events):
+    """Store each event's past/upcoming status once, for the file split and the report"""
+    for event in events:
+        event['past'] = is_past_event(event['dates'])
+    return events
+
 def modify_tournament_url(original_url):
     """Insert /en/ and append /results/ to tournament URL"""
     if not original_url:
@@ -50,18 +85,16 @@ def modify_tournament_url(original_url):
     modified_url += 'results/'
     return modified_url
 
+# Events can share pages, so each URL is fetched at most once per run
+@lru_cache(maxsize=None)
 def get_tournament_links(resources_url):
     """Extract individual tournament links from a resources page, filtering for Classic Constructed"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
         print(f"  Fetching tournament links from: {resources_url}")
-        response = requests.get(resources_url, headers=headers, timeout=10)
+        response = SESSION.get(resources_url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=LISTBLOCK_ITEMS)
         tournaments = []
         
         # Find all tournament cards
@@ -94,49 +127,34 @@ def get_tournament_links(resources_url):
 
 def save_links_to_file(events, filename_prefix="tournament_links"):
     """Save all modified tournament URLs to separate files for past and upcoming events"""
-    past_events = []
-    upcoming_events = []
-    
     # Separate events
-    for event in events:
-        if is_past_event(event['dates']):
-            past_events.append(event)
-        else:
-            upcoming_events.append(event)
+    past_events = [event for event in events if event['past']]
+    upcoming_events = [event for event in events if not event['past']]
     
-    # Save past events
-    with open(f"{filename_prefix}_past.txt", 'w', encoding='utf-8') as f:
-        for event in past_events:
-            if event.get('tournaments'):
-                for tournament in event['tournaments']:
-                    if tournament.get('results_url'):
-                        f.write(tournament['results_url'] + '\n')
-    
-    # Save upcoming events
-    with open(f"{filename_prefix}_upcoming.txt", 'w', encoding='utf-8') as f:
-        for event in upcoming_events:
-            if event.get('tournaments'):
-                for tournament in event['tournaments']:
-                    if tournament.get('results_url'):
-                        f.write(tournament['results_url'] + '\n')
+    # One buffered writelines per file over every results URL
+    for suffix, group in (('past', past_events), ('upcoming', upcoming_events)):
+        with open(f"{filename_prefix}_{suffix}.txt", 'w', encoding='utf-8') as f:
+            f.writelines(
+                tournament['results_url'] + '\n'
+                for event in group
+                for tournament in event.get('tournaments') or ()
+                if tournament.get('results_url')
+            )
     
     print(f"\nSaved {len(past_events)} past events to {filename_prefix}_past.txt")
     print(f"Saved {len(upcoming_events)} upcoming events to {filename_prefix}_upcoming.txt")
+@lru_cache(maxsize=None)
 def get_resources_page(event_url):
     """Find the specific 'Pairings, Results and Standings' card link"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
         print(f"  Finding resources page for: {event_url}")
-        response = requests.get(event_url, headers=headers, timeout=10)
+        response = SESSION.get(event_url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=LISTBLOCK_ITEMS)
         
         # Specifically target the card with "Pairings, Results and Standings" text
-        resources_card = soup.find('h5', string=lambda t: t and 'Pairings, Results, and Standings' in t)
+        resources_card = soup.find('h5', string=is_resources_title)
         
         if resources_card:
             # Navigate up to the parent card element then find the link
@@ -152,26 +170,33 @@ def get_resources_page(event_url):
         print(f"Error getting resources page from {event_url}: {str(e)}")
         return None
 
+def get_event_tournaments(event_url, event_name):
+    """Resolve an event's resources page and its Classic Constructed tournaments."""
+    print(f"\nProcessing event: {event_name}")
+    
+    # Get resources page
+    resources_url = get_resources_page(event_url)
+    if not resources_url:
+        return None, None
+    
+    # Get all tournament links from resources page
+    return resources_url, get_tournament_links(resources_url)
+
 def get_all_events_with_resources():
     base_url = "https://fabtcg.com"
     org_play_url = urljoin(base_url, "/en/organised-play/")
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
         print(f"Fetching main organized play page: {org_play_url}")
-        response = requests.get(org_play_url, headers=headers, timeout=10)
+        response = SESSION.get(org_play_url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=MONTH_SECTIONS)
         events = []
-        month_names = ['January', 'February', 'March', 'April', 'May', 'June', 
-                     'July', 'August', 'September', 'October', 'November', 'December']
         
         # Find all month sections
         month_sections = soup.find_all('div', class_='block-pageLinkBlockWithURL')
+        event_links = []
         
         for section in month_sections:
             # Extract month name
@@ -182,7 +207,8 @@ def get_all_events_with_resources():
             month_name = month_heading.text.strip()
             
             # Skip if not a valid month name
-            if not any(month.lower() in month_name.lower() for month in month_names):
+            month_key = month_name.lower()
+            if not any(month in month_key for month in MONTH_NAMES):
                 continue
             
             # Find all event cards in this month
@@ -194,29 +220,33 @@ def get_all_events_with_resources():
                 # Get main event link
                 link = card.find('a', class_='item-link')
                 if link and link.has_attr('href'):
-                    event_url = urljoin(base_url, link['href'])
-                    event_name = link.find('h5').text.strip() if link.find('h5') else "Unknown Event"
-                    event_dates = link.find('p').text.strip() if link.find('p') else "No dates"
-                    
-                    print(f"\nProcessing event: {event_name}")
-                    
-                    # Get resources page
-                    resources_url = get_resources_page(event_url)
-                    
-                    if resources_url:
-                        # Get all tournament links from resources page
-                        tournaments = get_tournament_links(resources_url)
-                        
-                        events.append({
-                            'month': month_name,
-                            'name': event_name,
-                            'url': event_url,
-                            'dates': event_dates,
-                            'resources_page': resources_url,
-                            'tournaments': tournaments if tournaments else []
-                        })
-                    else:
-                        print(f"  No resources page found for {event_name}")
+                    event_links.append((
+                        month_name,
+                        urljoin(base_url, link['href']),
+                        link.find('h5').text.strip() if link.find('h5') else "Unknown Event",
+                        link.find('p').text.strip() if link.find('p') else "No dates"
+                    ))
+        
+        # Each event needs two dependent fetches; events of every month are independent,
+        # so the whole crawl takes about as long as its slowest event
+        with ThreadPoolExecutor(max_workers=EVENT_WORKERS) as executor:
+            results = executor.map(
+                lambda event: get_event_tournaments(event_url=event[1], event_name=event[2]),
+                event_links
+            )
+        
+        for (month_name, event_url, event_name, event_dates), (resources_url, tournaments) in zip(event_links, results):
+            if resources_url:
+                events.append({
+                    'month': month_name,
+                    'name': event_name,
+                    'url': event_url,
+                    'dates': event_dates,
+                    'resources_page': resources_url,
+                    'tournaments': tournaments if tournaments else []
+                })
+            else:
+                print(f"  No resources page found for {event_name}")
         
         return events
     
@@ -224,23 +254,27 @@ def get_all_events_with_resources():
         print(f"Error getting main organized play page: {str(e)}")
         return []
 
-# Run the scraper
-all_events = get_all_events_with_resources()
-
-# Print results with proper date status
-print("\nFinal Results:")
-for event in all_events:
-    status = "PAST" if is_past_event(event['dates']) else "UPCOMING"
-    print(f"\n[{status}] {event['month']} - {event['name']} ({event['dates']})")
-    print(f"Event URL: {event['url']}")
-    print(f"Resources Page: {event['resources_page']}")
+def main():
+    # Run the scraper
+    all_events = mark_past_events(get_all_events_with_resources())
     
-    if event.get('tournaments'):
-        print("Classic Constructed Tournaments:")
-        for tournament in event['tournaments']:
-            print(f"  {tournament['name']}")
-            print(f"    Original URL: {tournament['url']}")
-            print(f"    Results URL: {tournament['results_url']}")
-
-# Save to separate files
-save_links_to_file(all_events)
\ No newline at end of file
+    # Print results with proper date status
+    print("\nFinal Results:")
+    for event in all_events:
+        status = "PAST" if event['past'] else "UPCOMING"
+        print(f"\n[{status}] {event['month']} - {event['name']} ({event['dates']})")
+        print(f"Event URL: {event['url']}")
+        print(f"Resources Page: {event['resources_page']}")
+        
+        if event.get('tournaments'):
+            print("Classic Constructed Tournaments:")
+            for tournament in event['tournaments']:
+                print(f"  {tournament['name']}")
+                print(f"    Original URL: {tournament['url']}")
+                print(f"    Results URL: {tournament['results_url']}")
+    
+    # Save to separate files
+    save_links_to_file(all_events)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from lxml import etree
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import argparse
+import csv
 import os
+import re
+import sys
 
 BASE_URL = "https://fabtcg.com/en/coverage/calling-bologna-2025/results/{}/"
 OUTPUT_DIR = "tournament_results"
@@ -11,6 +25,25 @@ PLAYER_STATS_FILE = "player_stats.csv"
 HERO_STATS_FILE = "hero_stats.csv"
 PLAYER_DETAILS_DIR = "player_details"
 HERO_MATCHUPS_DIR = "hero_matchups"
+PLAYER_DETAILS_FILE = "player_details.csv"
+HERO_MATCHUPS_FILE = "hero_matchups.csv"
+DETAIL_COLUMNS = ['Round', 'Opponent', 'Opponent Hero', 'Result', 'Player Hero']
+MATCH_COLUMNS = ['Round', 'Player 1 Name', 'Player 1 Hero', 'Player 2 Name', 'Player 2 Hero', 'Winner', 'Winning Hero']
+MATCHUP_COLUMNS = ['Hero', 'Opponent Hero', 'Wins', 'Losses', 'Total Matches', 'Win Rate']
+# Threads for writing the per-player/per-hero files; the GIL is released during file I/O
+WRITE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Every character that is not alphanumeric (str.isalnum) becomes "_" in file names
+UNSAFE_FILENAME_CHAR = re.compile(r'[\W_]')
+
+# Every request goes to fabtcg.com, so one keep-alive session reuses its connections;
+# pages are cached on disk and, once expired, revalidated with their stored
+# ETag/Last-Modified so unchanged rounds come back as a 304 without a body
+SESSION = requests_cache.CachedSession('fab_cache', cache_control=True, expire_after=3600)
+SESSION.headers["Connection"] = "keep-alive"
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=1, pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+))
 
 def get_tournament_url():
     """Prompt user for tournament URL and validate format."""
@@ -33,18 +66,85 @@ def get_tournament_url():
         # Test the base URL
         test_url = f"{url}1/"  # Test with round 1
         try:
-            response = requests.head(test_url, timeout=5)
+            response = SESSION.head(test_url, timeout=5, allow_redirects=True)
             if response.status_code == 200:
                 return url
             print(f"Couldn't access tournament data (HTTP {response.status_code}). Please check the URL.")
         except requests.RequestException:
             print("Invalid URL or couldn't connect. Please try again.")
 
+@dataclass
+class Match:
+    """One scraped match; winner is 0 for player 1, 1 for player 2 and -1 when nobody won."""
+    # Declared by hand rather than with dataclass(slots=True), which needs Python 3.10
+    __slots__ = ('round', 'player1', 'player1_hero', 'player2', 'player2_hero', 'winner')
+    
+    round: str
+    player1: str
+    player1_hero: str
+    player2: str
+    player2_hero: str
+    winner: int
+    
+    def as_row(self):
+        """Values in MATCH_COLUMNS order, as written to match_results.csv."""
+        if self.winner == 0:
+            winner, winning_hero = self.player1, self.player1_hero
+        elif self.winner == 1:
+            winner, winning_hero = self.player2, self.player2_hero
+        else:
+            winner = winning_hero = None
+        return (self.round, self.player1, self.player1_hero, self.player2, self.player2_hero, winner, winning_hero)
+
+def round_exists(base_url, round_num):
+    """Whether a round's results page is there, checked with a HEAD request."""
+    response = SESSION.head(f"{base_url}{round_num}/", timeout=5, allow_redirects=True)
+    return response.status_code == 200
+
+def find_last_round(base_url, max_rounds):
+    """Last round with a results page (0 if none), probing rounds 1, 2, 4, 8, ... then bisecting."""
+    if not round_exists(base_url, 1):
+        return 0
+    
+    found, missing = 1, None
+    while missing is None:
+        probe = min(found * 2, max_rounds)
+        if probe == found:
+            return found
+        if round_exists(base_url, probe):
+            found = probe
+        else:
+            missing = probe
+    
+    while missing - found > 1:
+        middle = (found + missing) // 2
+        if round_exists(base_url, middle):
+            found = middle
+        else:
+            missing = middle
+    return found
+
+def has_class(css_class):
+    """XPath predicate for css_class as one token of @class, as BeautifulSoup's class_ matches."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')"
+
+# Compiled once and reused for every row; comments are dropped so text matches get_text()
+HTML_PARSER = etree.HTMLParser(encoding='utf-8', remove_comments=True)
+RESULT_ROWS = etree.XPath(f"//div[{has_class('tournament-coverage__row--results')}]")
+ROW_PLAYERS = etree.XPath(f".//div[{has_class('tournament-coverage__player')}]")
+PLAYER_NAME = etree.XPath("(.//span)[1]")
+PLAYER_HERO = etree.XPath(f"(.//div[{has_class('tournament-coverage__player-hero-and-deck')}])[1]")
+WINNER_CLASS = 'tournament-coverage__player--winner'
+
+def element_text(element):
+    """Text of an element and its descendants, each piece stripped, like get_text(strip=True)."""
+    return ''.join(text.strip() for text in element.itertext())
+
 def fetch_page(url):
-    """Fetch a webpage and return its BeautifulSoup object."""
-    response = requests.get(url)
+    """Fetch a webpage and return its parsed lxml tree."""
+    response = SESSION.get(url)
     if response.status_code == 200:
-        return BeautifulSoup(response.text, 'html.parser')
+        return etree.fromstring(response.content, HTML_PARSER)
     else:
         print(f"Failed to fetch {url}. Status: {response.status_code}")
         return None
@@ -52,162 +152,254 @@ def fetch_page(url):
 def scrape_round(base_url, round_num):
     """Scrape match data for a specific round."""
     url = f"{base_url}{round_num}/"
-    soup = fetch_page(url)
-    if not soup:
+    tree = fetch_page(url)
+    if tree is None:
         return []
     
     matches = []
-    match_rows = soup.find_all('div', class_='tournament-coverage__row--results')
-    
-    for row in match_rows:
-        players = row.find_all('div', class_='tournament-coverage__player')
+    for row in RESULT_ROWS(tree):
+        players = ROW_PLAYERS(row)
         
         if len(players) >= 2:
+            # Names and heroes repeat every round, so each is interned into one shared
+            # string that the stats dicts in calculate_stats match by identity
+            
             # Player 1 data
-            player1_name = players[0].find('span').get_text(strip=True)
-            player1_hero = players[0].find('div', class_='tournament-coverage__player-hero-and-deck').get_text(strip=True)
+            player1_name = sys.intern(element_text(PLAYER_NAME(players[0])[0]))
+            player1_hero = sys.intern(element_text(PLAYER_HERO(players[0])[0]))
             
             # Player 2 data
-            player2_name = players[1].find('span').get_text(strip=True)
-            player2_hero = players[1].find('div', class_='tournament-coverage__player-hero-and-deck').get_text(strip=True)
+            player2_name = sys.intern(element_text(PLAYER_NAME(players[1])[0]))
+            player2_hero = sys.intern(element_text(PLAYER_HERO(players[1])[0]))
             
-            # Determine winner
-            winner = None
-            if 'tournament-coverage__player--winner' in players[0]['class']:
-                winner = player1_name
-            elif 'tournament-coverage__player--winner' in players[1]['class']:
-                winner = player2_name
+            # Determine winner with a plain substring test on the raw class attribute;
+            # no other class name on the page contains the winner modifier
+            winner = -1
+            if WINNER_CLASS in players[0].get('class', ''):
+                winner = 0
+            elif WINNER_CLASS in players[1].get('class', ''):
+                winner = 1
             
-            matches.append({
-                'Round': f"Round {round_num}",
-                'Player 1 Name': player1_name,
-                'Player 1 Hero': player1_hero,
-                'Player 2 Name': player2_name,
-                'Player 2 Hero': player2_hero,
-                'Winner': winner,
-                'Winning Hero': player1_hero if winner == player1_name else player2_hero if winner == player2_name else None
-            })
+            matches.append(Match(f"Round {round_num}", player1_name, player1_hero, player2_name, player2_hero, winner))
     
     return matches
 
-def calculate_stats(matches):
-    """Calculate player and hero statistics."""
-    player_stats = defaultdict(lambda: {'wins': 0, 'losses': 0, 'heroes_used': set()})
-    hero_stats = defaultdict(lambda: {'wins': 0, 'losses': 0, 'matchups': defaultdict(lambda: {'wins': 0, 'losses': 0})})
-    player_details = defaultdict(list)
+def calculate_stats(matches, stats=None):
+    """Calculate player and hero statistics, adding to the stats of an earlier call if given."""
+    if stats is None:
+        stats = (
+            {},
+            defaultdict(lambda: {'wins': 0, 'played': 0}),
+            defaultdict(lambda: [0, 0]),
+            {column: [] for column in ['Player'] + DETAIL_COLUMNS}
+        )
+    player_stats, hero_stats, matchups, player_details = stats
     
     for match in matches:
-        player1 = match['Player 1 Name']
-        player2 = match['Player 2 Name']
-        hero1 = match['Player 1 Hero']
-        hero2 = match['Player 2 Hero']
-        winner = match['Winner']
+        player1 = match.player1
+        player2 = match.player2
+        hero1 = match.player1_hero
+        hero2 = match.player2_hero
+        # Winning side: 0 for player 1, 1 for player 2, -1 for no winner
+        won = match.winner
         
         # Track player stats
-        player_stats[player1]['heroes_used'].add(hero1)
-        player_stats[player2]['heroes_used'].add(hero2)
-        
-        # Track hero stats
-        if winner == player1:
-            player_stats[player1]['wins'] += 1
-            player_stats[player2]['losses'] += 1
-            hero_stats[hero1]['wins'] += 1
-            hero_stats[hero2]['losses'] += 1
-            hero_stats[hero1]['matchups'][hero2]['wins'] += 1
-            hero_stats[hero2]['matchups'][hero1]['losses'] += 1
-        elif winner == player2:
-            player_stats[player2]['wins'] += 1
-            player_stats[player1]['losses'] += 1
-            hero_stats[hero2]['wins'] += 1
-            hero_stats[hero1]['losses'] += 1
-            hero_stats[hero2]['matchups'][hero1]['wins'] += 1
-            hero_stats[hero1]['matchups'][hero2]['losses'] += 1
+        stats1 = player_stats.get(player1)
+        if stats1 is None:
+            stats1 = player_stats[player1] = {'wins': 0, 'played': 0, 'heroes_used': set()}
+        stats2 = player_stats.get(player2)
+        if stats2 is None:
+            stats2 = player_stats[player2] = {'wins': 0, 'played': 0, 'heroes_used': set()}
+        stats1['heroes_used'].add(hero1)
+        stats2['heroes_used'].add(hero2)
         
-        # Record player details
-        player_details[player1].append({
-            'Round': match['Round'],
-            'Opponent': player2,
-            'Opponent Hero': hero2,
-            'Result': 'Win' if winner == player1 else 'Loss',
-            'Player Hero': hero1
-        })
+        # Track hero stats; losses are played - wins, and each pairing is stored once
+        # under its sorted heroes as [wins of the first, played]
+        if won >= 0:
+            if won == 0:
+                winner_stats, winner_hero, loser_stats, loser_hero = stats1, hero1, stats2, hero2
+            else:
+                winner_stats, winner_hero, loser_stats, loser_hero = stats2, hero2, stats1, hero1
+            winner_stats['wins'] += 1
+            winner_stats['played'] += 1
+            loser_stats['played'] += 1
+            
+            winner_hero_stats = hero_stats[winner_hero]
+            winner_hero_stats['wins'] += 1
+            winner_hero_stats['played'] += 1
+            hero_stats[loser_hero]['played'] += 1
+            
+            matchup = matchups[min(hero1, hero2), max(hero1, hero2)]
+            matchup[0] += winner_hero <= loser_hero
+            matchup[1] += 1
         
-        player_details[player2].append({
-            'Round': match['Round'],
-            'Opponent': player1,
-            'Opponent Hero': hero1,
-            'Result': 'Win' if winner == player2 else 'Loss',
-            'Player Hero': hero2
-        })
+        # Record player details, one row per side, as parallel columns
+        round_name = match.round
+        player_details['Player'] += (player1, player2)
+        player_details['Round'] += (round_name, round_name)
+        player_details['Opponent'] += (player2, player1)
+        player_details['Opponent Hero'] += (hero2, hero1)
+        player_details['Result'] += ('Win' if won == 0 else 'Loss', 'Win' if won == 1 else 'Loss')
+        player_details['Player Hero'] += (hero1, hero2)
     
-    return player_stats, hero_stats, player_details
+    return player_stats, hero_stats, matchups, player_details
+
+def matchup_row(hero, opponent, wins, losses):
+    total = wins + losses
+    return {
+        'Hero': hero,
+        'Opponent Hero': opponent,
+        'Wins': wins,
+        'Losses': losses,
+        'Total Matches': total,
+        'Win Rate': round(wins / total * 100, 2)
+    }
 
-def prepare_hero_stats(hero_stats):
+def win_rates(wins, played):
+    """Percentage of games won, rounded to 2 places, for arrays of counts; 0 where none were played."""
+    return np.round(np.divide(wins, played, out=np.zeros(len(wins)), where=played > 0) * 100, 2)
+
+def prepare_hero_stats(hero_stats, matchups):
     """Prepare hero statistics for CSV output."""
-    # Overall hero stats
-    overall_stats = []
-    for hero, stats in hero_stats.items():
-        total = stats['wins'] + stats['losses']
-        overall_stats.append({
-            'Hero': hero,
-            'Wins': stats['wins'],
-            'Losses': stats['losses'],
-            'Total Matches': total,
-            'Win Rate': round(stats['wins'] / total * 100, 2) if total > 0 else 0
-        })
+    # Overall hero stats, computed column-wise
+    wins = np.fromiter((stats['wins'] for stats in hero_stats.values()), dtype=np.int64, count=len(hero_stats))
+    played = np.fromiter((stats['played'] for stats in hero_stats.values()), dtype=np.int64, count=len(hero_stats))
+    overall_stats = pd.DataFrame({
+        'Hero': list(hero_stats),
+        'Wins': wins,
+        'Losses': played - wins,
+        'Total Matches': played,
+        'Win Rate': win_rates(wins, played)
+    })
     
-    # Hero matchup stats
-    matchup_stats = []
-    for hero, stats in hero_stats.items():
-        for opponent, matchup in stats['matchups'].items():
-            total = matchup['wins'] + matchup['losses']
-            if total > 0:
-                matchup_stats.append({
-                    'Hero': hero,
-                    'Opponent Hero': opponent,
-                    'Wins': matchup['wins'],
-                    'Losses': matchup['losses'],
-                    'Total Matches': total,
-                    'Win Rate': round(matchup['wins'] / total * 100, 2)
-                })
+    # Hero matchup stats, unfolded into both heroes' views; pairings were recorded
+    # in order of their first match, which is each hero's opponent order
+    rows_by_hero = {hero: [] for hero in hero_stats}
+    for (hero, opponent), (wins, played) in matchups.items():
+        if hero == opponent:
+            # A mirror match is a win and a loss for the same hero
+            rows_by_hero[hero].append(matchup_row(hero, hero, played, played))
+        else:
+            rows_by_hero[hero].append(matchup_row(hero, opponent, wins, played - wins))
+            rows_by_hero[opponent].append(matchup_row(opponent, hero, played - wins, wins))
+    matchup_stats = [row for rows in rows_by_hero.values() for row in rows]
     
     return overall_stats, matchup_stats
 
-def save_player_details(player_details):
-    """Save individual player details to separate CSV files."""
-    if not os.path.exists(os.path.join(OUTPUT_DIR, PLAYER_DETAILS_DIR)):
-        os.makedirs(os.path.join(OUTPUT_DIR, PLAYER_DETAILS_DIR))
-    
-    for player, matches in player_details.items():
-        safe_name = "".join(c if c.isalnum() else "_" for c in player)
-        filename = f"{safe_name}_details.csv"
-        filepath = os.path.join(OUTPUT_DIR, PLAYER_DETAILS_DIR, filename)
-        
-        df = pd.DataFrame(matches)
+def aggregate_path(filename, parquet):
+    """Path of an aggregate output file, with a .parquet extension when writing Parquet."""
+    if parquet:
+        filename = os.path.splitext(filename)[0] + '.parquet'
+    return os.path.join(OUTPUT_DIR, filename)
+
+def save_frame(df, filename, parquet):
+    """Write an aggregate DataFrame as zstd Parquet or CSV and return its path."""
+    filepath = aggregate_path(filename, parquet)
+    if parquet:
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), filepath, compression='zstd')
+    else:
         df.to_csv(filepath, index=False)
+    return filepath
 
-def save_hero_matchups(hero_stats):
-    """Save hero matchup statistics."""
-    if not os.path.exists(os.path.join(OUTPUT_DIR, HERO_MATCHUPS_DIR)):
-        os.makedirs(os.path.join(OUTPUT_DIR, HERO_MATCHUPS_DIR))
+class MatchResultsWriter:
+    """Writes match results round by round, as Parquet row groups or CSV rows."""
+    SCHEMA = pa.schema([(column, pa.string()) for column in MATCH_COLUMNS])
+    
+    def __init__(self, parquet):
+        self.path = aggregate_path(MATCH_RESULTS_FILE, parquet)
+        if parquet:
+            self._file = None
+            self._writer = pq.ParquetWriter(self.path, self.SCHEMA, compression='zstd')
+        else:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file, lineterminator='\n')
+            self._writer.writerow(MATCH_COLUMNS)
     
-    overall_stats, matchup_stats = prepare_hero_stats(hero_stats)
+    def write(self, matches):
+        rows = [match.as_row() for match in matches]
+        if self._file is None:
+            self._writer.write_table(pa.Table.from_pylist([dict(zip(MATCH_COLUMNS, row)) for row in rows], schema=self.SCHEMA))
+        else:
+            self._writer.writerows(rows)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        (self._file or self._writer).close()
+
+def write_csv(filepath, rows, fieldnames):
+    """Write a header and row tuples to a CSV file in one go."""
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(fieldnames)
+        writer.writerows(rows)
+
+def write_csv_files(files, fieldnames):
+    """Write {filepath: rows} CSV files concurrently."""
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+        # Consume the results so a failed write raises here
+        list(executor.map(lambda item: write_csv(item[0], item[1], fieldnames), files.items()))
+
+def save_player_details(player_details, parquet=True, aggregate=False):
+    """Save player details, one CSV file per player unless aggregate, and return where they went."""
+    if aggregate:
+        filepath = aggregate_path(PLAYER_DETAILS_FILE, parquet)
+        columns = ['Player'] + DETAIL_COLUMNS
+        if parquet:
+            table = pa.Table.from_pydict({column: player_details[column] for column in columns})
+            pq.write_table(table, filepath, compression='zstd')
+        else:
+            write_csv(filepath, zip(*(player_details[column] for column in columns)), columns)
+        return filepath
+    
+    os.makedirs(os.path.join(OUTPUT_DIR, PLAYER_DETAILS_DIR), exist_ok=True)
+    
+    # Group the detail rows by player, keeping first-seen order
+    matches_by_player = {}
+    rows = zip(*(player_details[column] for column in DETAIL_COLUMNS))
+    for player, row in zip(player_details['Player'], rows):
+        matches_by_player.setdefault(player, []).append(row)
+    
+    # A few rows per file, so the csv module is far cheaper than a DataFrame each.
+    # Keyed by path so names that sanitize alike still end with the last player's rows
+    files = {}
+    for player, matches in matches_by_player.items():
+        safe_name = UNSAFE_FILENAME_CHAR.sub("_", player)
+        filename = f"{safe_name}_details.csv"
+        files[os.path.join(OUTPUT_DIR, PLAYER_DETAILS_DIR, filename)] = matches
+    write_csv_files(files, DETAIL_COLUMNS)
+    
+    return os.path.join(OUTPUT_DIR, PLAYER_DETAILS_DIR)
+
+def save_hero_matchups(hero_stats, matchups, parquet=True, aggregate=False):
+    """Save hero statistics and matchups (per hero unless aggregate) and return where each went."""
+    overall_stats, matchup_stats = prepare_hero_stats(hero_stats, matchups)
     
     # Save overall hero stats
-    df_overall = pd.DataFrame(overall_stats)
-    df_overall.to_csv(os.path.join(OUTPUT_DIR, HERO_STATS_FILE), index=False)
+    stats_path = save_frame(overall_stats, HERO_STATS_FILE, parquet)
+    
+    if aggregate:
+        filepath = aggregate_path(HERO_MATCHUPS_FILE, parquet)
+        if parquet:
+            pq.write_table(pa.Table.from_pylist(matchup_stats), filepath, compression='zstd')
+        else:
+            write_csv(filepath, map(itemgetter(*MATCHUP_COLUMNS), matchup_stats), MATCHUP_COLUMNS)
+        return stats_path, filepath
     
-    # Save matchup details per hero
-    df_matchups = pd.DataFrame(matchup_stats)
-    for hero in df_matchups['Hero'].unique():
-        safe_name = "".join(c if c.isalnum() else "_" for c in hero)
+    os.makedirs(os.path.join(OUTPUT_DIR, HERO_MATCHUPS_DIR), exist_ok=True)
+    
+    # Save matchup details per hero; prepare_hero_stats emits each hero's rows together
+    files = {}
+    for hero, hero_matchups in groupby(matchup_stats, key=lambda matchup: matchup['Hero']):
+        safe_name = UNSAFE_FILENAME_CHAR.sub("_", hero)
         filename = f"{safe_name}_matchups.csv"
-        filepath = os.path.join(OUTPUT_DIR, HERO_MATCHUPS_DIR, filename)
-        
-        hero_df = df_matchups[df_matchups['Hero'] == hero]
-        hero_df.to_csv(filepath, index=False)
+        files[os.path.join(OUTPUT_DIR, HERO_MATCHUPS_DIR, filename)] = list(map(itemgetter(*MATCHUP_COLUMNS), hero_matchups))
+    write_csv_files(files, MATCHUP_COLUMNS)
+    
+    return stats_path, os.path.join(OUTPUT_DIR, HERO_MATCHUPS_DIR)
 
-def main():
+def main(parquet=True, aggregate=False):
     # Get tournament URL from user
     BASE_URL = get_tournament_url()
     
@@ -220,63 +412,89 @@ def main():
     HERO_MATCHUPS_DIR = "hero_matchups"
     
     # Create output directory if it doesn't exist
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     # Scrape rounds 1 through N
-    all_rounds = []
+    match_count = 0
     max_rounds = 20  # Adjust based on tournament rounds
     max_empty_rounds = 1  # Stop after this many empty rounds
     
-    empty_rounds = 0
-    for round_num in range(1, max_rounds + 1):
-        print(f"Scraping Round {round_num}...", end=' ')
-        round_matches = scrape_round(BASE_URL, round_num)
-        
-        if not round_matches:
-            print("no data")
-            empty_rounds += 1
-            if empty_rounds >= max_empty_rounds:
-                print(f"Stopping after {max_empty_rounds} empty rounds.")
-                break
-            continue
-        
-        empty_rounds = 0
-        all_rounds.extend(round_matches)
-        print(f"found {len(round_matches)} matches")
+    # Locate the last round with a few HEAD requests, so only rounds that exist (and the
+    # first missing one, which ends the walk below) are fetched
+    try:
+        last_round = find_last_round(BASE_URL, max_rounds)
+    except requests.RequestException:
+        last_round = max_rounds
+    rounds_to_fetch = min(last_round + 1, max_rounds)
     
-    if all_rounds:
-        # Save match results
-        df_matches = pd.DataFrame(all_rounds)
-        df_matches.to_csv(os.path.join(OUTPUT_DIR, MATCH_RESULTS_FILE), index=False)
-        print(f"\nMatch results saved to {os.path.join(OUTPUT_DIR, MATCH_RESULTS_FILE)}")
-        
-        # Calculate stats
-        player_stats, hero_stats, player_details = calculate_stats(all_rounds)
-        
-        # Save player statistics
-        player_stats_list = [{
-            'Player': player,
-            'Wins': stats['wins'],
-            'Losses': stats['losses'],
-            'Win Rate': round(stats['wins'] / (stats['wins'] + stats['losses']) * 100, 2) if (stats['wins'] + stats['losses']) > 0 else 0,
-            'Heroes Used': ', '.join(stats['heroes_used'])
-        } for player, stats in player_stats.items()]
-        
-        df_player_stats = pd.DataFrame(player_stats_list)
-        df_player_stats.to_csv(os.path.join(OUTPUT_DIR, PLAYER_STATS_FILE), index=False)
-        print(f"Player statistics saved to {os.path.join(OUTPUT_DIR, PLAYER_STATS_FILE)}")
+    # Request every round at once and tally each round as soon as it and the ones before it
+    # have arrived, so the stats are built while later rounds are still downloading
+    print(f"Scraping up to {rounds_to_fetch} rounds...")
+    stats = None
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        round_results = executor.map(lambda round_num: scrape_round(BASE_URL, round_num), range(1, rounds_to_fetch + 1))
         
-        # Save player details
-        save_player_details(player_details)
-        print(f"Player details saved to {os.path.join(OUTPUT_DIR, PLAYER_DETAILS_DIR)}")
+        # Match rows go to disk round by round instead of being kept for one DataFrame
+        with MatchResultsWriter(parquet) as match_results:
+            empty_rounds = 0
+            for round_num, round_matches in enumerate(round_results, 1):
+                print(f"Scraping Round {round_num}...", end=' ')
+                
+                if not round_matches:
+                    print("no data")
+                    empty_rounds += 1
+                    if empty_rounds >= max_empty_rounds:
+                        print(f"Stopping after {max_empty_rounds} empty rounds.")
+                        break
+                    continue
+                
+                empty_rounds = 0
+                match_results.write(round_matches)
+                match_count += len(round_matches)
+                stats = calculate_stats(round_matches, stats)
+                print(f"found {len(round_matches)} matches")
         
-        # Save hero stats and matchups
-        save_hero_matchups(hero_stats)
-        print(f"Hero statistics saved to {os.path.join(OUTPUT_DIR, HERO_STATS_FILE)}")
-        print(f"Hero matchup details saved to {os.path.join(OUTPUT_DIR, HERO_MATCHUPS_DIR)}")
-    else:
-        print("\nNo data scraped.")
+        if match_count:
+            player_stats, hero_stats, matchups, player_details = stats
+            
+            # The many small detail and matchup files are written in the background
+            # while the aggregate files are built here
+            details_future = executor.submit(save_player_details, player_details, parquet, aggregate)
+            matchups_future = executor.submit(save_hero_matchups, hero_stats, matchups, parquet, aggregate)
+            
+            print(f"\nMatch results saved to {match_results.path}")
+            
+            # Save player statistics
+            wins = np.fromiter((stats['wins'] for stats in player_stats.values()), dtype=np.int64, count=len(player_stats))
+            played = np.fromiter((stats['played'] for stats in player_stats.values()), dtype=np.int64, count=len(player_stats))
+            df_player_stats = pd.DataFrame({
+                'Player': list(player_stats),
+                'Wins': wins,
+                'Losses': played - wins,
+                'Win Rate': win_rates(wins, played),
+                'Heroes Used': [', '.join(stats['heroes_used']) for stats in player_stats.values()]
+            })
+            player_stats_path = save_frame(df_player_stats, PLAYER_STATS_FILE, parquet)
+            print(f"Player statistics saved to {player_stats_path}")
+            
+            # Save player details
+            details_path = details_future.result()
+            print(f"Player details saved to {details_path}")
+            
+            # Save hero stats and matchups
+            hero_stats_path, matchups_path = matchups_future.result()
+            print(f"Hero statistics saved to {hero_stats_path}")
+            print(f"Hero matchup details saved to {matchups_path}")
+        else:
+            os.remove(match_results.path)
+            print("\nNo data scraped.")
+    
+    SESSION.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape a tournament's results into player and hero statistics.")
+    parser.add_argument('--csv', action='store_true', help="write the aggregate files as CSV instead of Parquet")
+    parser.add_argument('--aggregate', action='store_true',
+                        help="write one player_details and one hero_matchups file instead of a file per player and per hero")
+    args = parser.parse_args()
+    main(parquet=not args.csv, aggregate=args.aggregate)
\ No newline at end of file